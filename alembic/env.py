@@ -10,6 +10,9 @@ from app.auth.models import *
 from app.products.models import *
 from app.cart.models import *
 from app.orders.models import *
+from app.mail.models import *
+from app.idempotency.models import *
+from app.analytics.models import *
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
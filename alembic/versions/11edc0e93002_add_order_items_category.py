@@ -0,0 +1,33 @@
+"""add order items category
+
+Revision ID: 11edc0e93002
+Revises: 3dcce77bbf4d
+Create Date: 2026-10-18 05:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11edc0e93002'
+down_revision: Union[str, Sequence[str], None] = '3dcce77bbf4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('order_items', sa.Column('category', sa.String(), nullable=True))
+    # existing lines take their product's current category; lines of deleted products stay NULL
+    op.execute(
+        "UPDATE order_items SET category = "
+        "(SELECT products.category FROM products WHERE products.id = order_items.product_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('order_items', 'category')
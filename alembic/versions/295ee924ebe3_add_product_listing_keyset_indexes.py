@@ -0,0 +1,36 @@
+"""Add product listing keyset indexes
+
+Revision ID: 295ee924ebe3
+Revises: 711246682f91
+Create Date: 2026-10-18 10:48:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '295ee924ebe3'
+down_revision: Union[str, Sequence[str], None] = '711246682f91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so a large catalog keeps serving reads while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_products_price_id', 'products', ['price', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_products_category_name_id', 'products', ['category', 'name', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_products_category_price_id', 'products', ['category', 'price', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_category_price_id', table_name='products')
+    op.drop_index('ix_products_category_name_id', table_name='products')
+    op.drop_index('ix_products_price_id', table_name='products')
+    op.drop_index('ix_products_name_id', table_name='products')
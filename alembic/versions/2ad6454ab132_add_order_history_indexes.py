@@ -0,0 +1,32 @@
+"""Add order history indexes
+
+Revision ID: 2ad6454ab132
+Revises: 5b1970bf955a
+Create Date: 2026-10-18 11:32:05.114208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2ad6454ab132'
+down_revision: Union[str, Sequence[str], None] = '5b1970bf955a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so checkout keeps writing orders while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index('ix_orders_user_id_created_at_id', 'orders', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_orders_user_id_created_at_id', table_name='orders')
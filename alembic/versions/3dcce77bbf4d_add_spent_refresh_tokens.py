@@ -0,0 +1,36 @@
+"""add spent refresh tokens
+
+Revision ID: 3dcce77bbf4d
+Revises: 3c52fdfc0482
+Create Date: 2026-10-18 05:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3dcce77bbf4d'
+down_revision: Union[str, Sequence[str], None] = '3c52fdfc0482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('spent_refresh_tokens',
+    sa.Column('jti', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index('ix_spent_refresh_tokens_expires_at', 'spent_refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_spent_refresh_tokens_expires_at', table_name='spent_refresh_tokens')
+    op.drop_table('spent_refresh_tokens')
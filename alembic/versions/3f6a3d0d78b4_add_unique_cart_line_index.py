@@ -0,0 +1,38 @@
+"""Add unique cart line index
+
+Revision ID: 3f6a3d0d78b4
+Revises: 2ad6454ab132
+Create Date: 2026-10-18 12:06:41.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a3d0d78b4'
+down_revision: Union[str, Sequence[str], None] = '2ad6454ab132'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # fold duplicate lines left by concurrent adds into the oldest row first
+    op.execute(
+        "UPDATE carts SET quantity = ("
+        "SELECT SUM(dup.quantity) FROM carts AS dup "
+        "WHERE dup.user_id = carts.user_id AND dup.product_id = carts.product_id) "
+        "WHERE id IN (SELECT MIN(id) FROM carts GROUP BY user_id, product_id HAVING COUNT(*) > 1)"
+    )
+    op.execute(
+        "DELETE FROM carts WHERE id NOT IN (SELECT MIN(id) FROM carts GROUP BY user_id, product_id)"
+    )
+    op.create_index('ix_carts_user_id_product_id', 'carts', ['user_id', 'product_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_carts_user_id_product_id', table_name='carts')
@@ -0,0 +1,30 @@
+"""Add products sku
+
+Revision ID: 5b1970bf955a
+Revises: 295ee924ebe3
+Create Date: 2026-10-18 11:31:05.772310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1970bf955a'
+down_revision: Union[str, Sequence[str], None] = '295ee924ebe3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('sku', sa.String(), nullable=True))
+    op.create_index('ix_products_sku', 'products', ['sku'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_sku', table_name='products')
+    op.drop_column('products', 'sku')
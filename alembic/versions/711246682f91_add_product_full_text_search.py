@@ -0,0 +1,66 @@
+"""Add product full-text search
+
+Revision ID: 711246682f91
+Revises: d7431b31312e
+Create Date: 2026-10-18 10:02:11.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '711246682f91'
+down_revision: Union[str, Sequence[str], None] = 'd7431b31312e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED"
+        )
+        op.execute("CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE products_fts USING fts5("
+            "name, description, category, content='products', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN "
+            "INSERT INTO products_fts(rowid, name, description, category) "
+            "VALUES (new.id, new.name, new.description, new.category); END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, name, description, category) "
+            "VALUES ('delete', old.id, old.name, old.description, old.category); END"
+        )
+        op.execute(
+            "CREATE TRIGGER products_fts_au AFTER UPDATE OF name, description, category ON products BEGIN "
+            "INSERT INTO products_fts(products_fts, rowid, name, description, category) "
+            "VALUES ('delete', old.id, old.name, old.description, old.category); "
+            "INSERT INTO products_fts(rowid, name, description, category) "
+            "VALUES (new.id, new.name, new.description, new.category); END"
+        )
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+        op.drop_column('products', 'search_vector')
+    elif dialect == 'sqlite':
+        for trigger in ('products_fts_ai', 'products_fts_ad', 'products_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS products_fts")
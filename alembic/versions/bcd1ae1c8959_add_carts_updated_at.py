@@ -0,0 +1,32 @@
+"""add carts updated_at
+
+Revision ID: bcd1ae1c8959
+Revises: f24a4a8dda7b
+Create Date: 2026-10-18 04:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bcd1ae1c8959'
+down_revision: Union[str, Sequence[str], None] = 'f24a4a8dda7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # existing lines count as touched now, so they get a full idle period
+    op.add_column('carts', sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    op.alter_column('carts', 'updated_at', server_default=None)
+    op.create_index('ix_carts_updated_at', 'carts', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_carts_updated_at', table_name='carts')
+    op.drop_column('carts', 'updated_at')
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime
+from app.core.database import Base
+import datetime
+
+
+class SalesDaily(Base):
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class SalesDailyCategory(Base):
+    __tablename__ = "sales_daily_category"
+
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)  # the product's category when the order was placed
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class SalesDailyProduct(Base):
+    __tablename__ = "sales_daily_product"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)  # no FK: deleting a product keeps its history
+    orders = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class RollupState(Base):
+    """High-water mark of a rollup: every order up to ``last_order_id`` is counted."""
+    __tablename__ = "rollup_state"
+
+    name = Column(String, primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, nullable=False)
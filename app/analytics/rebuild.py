@@ -0,0 +1,41 @@
+"""Backfill the sales rollups from the whole order history.
+
+Empties the rollup tables, moves the high-water mark back to the first
+order and rolls everything up again in batches. Dashboards show partial
+totals until it finishes; the background job carries on from where it
+stops.
+
+    python -m app.analytics.rebuild --batch-size 5000
+"""
+import argparse
+import asyncio
+import time
+import app.auth.models  # noqa: F401  (User's relationships need every model mapped)
+import app.cart.models  # noqa: F401
+from app.analytics.rollups import reset
+from app.core.database import async_engine, session_scope
+from app.core.scheduler import scheduler
+
+
+async def rebuild(batch_size: int) -> int:
+    async with session_scope() as db:
+        await reset(db)
+        await db.commit()
+    return await scheduler.run_job("sales_rollups", batch_size)
+
+
+async def main(batch_size: int):
+    started = time.perf_counter()
+    try:
+        orders = await rebuild(batch_size)
+    finally:
+        if async_engine is not None:
+            await async_engine.dispose()
+    print(f"rolled up {orders} orders in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000, help="orders rolled up per transaction")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,104 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.analytics.models import RollupState, SalesDaily, SalesDailyCategory, SalesDailyProduct
+from app.core.config import settings
+from app.core.database import upsert
+from app.core.scheduler import scheduler
+from app.orders.models import Order, OrderItem, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+STATE = "sales"
+DAY = func.date(Order.created_at)
+UNCATEGORIZED = "uncategorized"  # lines of products that were gone before categories were snapshotted
+
+# each rollup table and the columns it groups by besides the day
+ROLLUPS = (
+    (SalesDaily, ()),
+    # the category snapshot on the line, so later re-categorising or deleting a product changes nothing
+    (SalesDailyCategory, (func.coalesce(OrderItem.category, UNCATEGORIZED).label("category"),)),
+    (SalesDailyProduct, (OrderItem.product_id,)),
+)
+TABLES = tuple(model.__table__ for model, _ in ROLLUPS)
+
+
+def aggregate(keys, *conditions):
+    """Paid order lines matching ``conditions``, summed per day and ``keys``."""
+    return (
+        select(
+            DAY,
+            *keys,
+            func.count(func.distinct(Order.id)),
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.quantity * OrderItem.price_at_purchase),
+        )
+        .select_from(Order)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(Order.status == OrderStatus.paid, *conditions)
+        .group_by(DAY, *keys)
+    )
+
+
+async def lock_state(db: AsyncSession) -> RollupState:
+    """The high-water mark row, created on first use and locked for this transaction."""
+    await db.execute(
+        upsert(db, RollupState.__table__).values(name=STATE, last_order_id=0, updated_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    return (await db.execute(
+        select(RollupState).where(RollupState.name == STATE).with_for_update()
+    )).scalars().one()
+
+
+async def roll_up(db: AsyncSession, limit: int) -> int:
+    """Fold up to ``limit`` orders past the high-water mark into the rollups.
+
+    Only orders older than ``analytics_settle_seconds`` are taken, so a
+    checkout that got a lower id but commits later than its neighbours is
+    not skipped. The counts and the new mark are written in the caller's
+    transaction, so every order is counted exactly once. Returns the number
+    of orders taken.
+    """
+    state = await lock_state(db)
+    settled = datetime.utcnow() - timedelta(seconds=settings.analytics_settle_seconds)
+    ids = (await db.scalars(
+        select(Order.id)
+        .where(Order.id > state.last_order_id, Order.created_at < settled)
+        .order_by(Order.id)
+        .limit(limit)
+    )).all()
+    if not ids:
+        return 0
+
+    batch = (Order.id > state.last_order_id, Order.id <= ids[-1])
+    for model, keys in ROLLUPS:
+        table = model.__table__
+        statement = upsert(db, table).from_select(
+            ["day", *(key.name for key in keys), "orders", "units", "revenue"], aggregate(keys, *batch)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key],
+            set_={name: table.c[name] + statement.excluded[name] for name in ("orders", "units", "revenue")},
+        )
+        await db.execute(statement)
+    state.last_order_id = ids[-1]
+    return len(ids)
+
+
+async def reset(db: AsyncSession):
+    """Empty the rollups and move the mark back to the first order; the caller commits."""
+    state = await lock_state(db)
+    for table in TABLES:
+        await db.execute(delete(table))
+    state.last_order_id = 0
+    logger.info("Sales rollups reset; they refill from the first order")
+
+
+async def pending_orders(db: AsyncSession) -> int:
+    last_order_id = await db.scalar(select(RollupState.last_order_id).where(RollupState.name == STATE)) or 0
+    return await db.scalar(select(func.count()).select_from(Order).where(Order.id > last_order_id))
+
+
+scheduler.register("sales_rollups", roll_up, interval=settings.analytics_rollup_interval)
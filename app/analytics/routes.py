@@ -0,0 +1,111 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.analytics import schemas
+from app.analytics.models import RollupState, SalesDaily, SalesDailyCategory, SalesDailyProduct
+from app.analytics.rollups import STATE, pending_orders
+from app.auth.dependencies import require_admin
+from app.core.replicas import get_read_db
+from app.products.models import Product
+
+router = APIRouter(prefix="/admin/analytics", tags=["Admin Analytics"])
+
+logger = logging.getLogger(__name__)
+
+MAX_DAYS = 366
+
+
+def date_range(start: Optional[date], end: Optional[date]) -> tuple:
+    """The requested days, defaulting to the 30 days up to today (UTC)."""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_DAYS} days per request")
+    return start, end
+
+
+def totals(model):
+    return (
+        func.sum(model.orders).label("orders"),
+        func.sum(model.units).label("units"),
+        func.sum(model.revenue).label("revenue"),
+    )
+
+
+def rounded(rows) -> list:
+    return [{**row._mapping, "revenue": round(row.revenue, 2)} for row in rows]
+
+
+@router.get("/sales/daily", response_model=List[schemas.DailySales])
+async def daily_sales(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    admin=Depends(require_admin),
+):
+    start, end = date_range(start, end)
+    rows = (await db.execute(
+        select(SalesDaily.day, SalesDaily.orders, SalesDaily.units, SalesDaily.revenue)
+        .where(SalesDaily.day.between(start, end))
+        .order_by(SalesDaily.day)
+    )).all()
+    return rounded(rows)
+
+
+@router.get("/sales/categories", response_model=List[schemas.CategorySales])
+async def category_sales(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    admin=Depends(require_admin),
+):
+    start, end = date_range(start, end)
+    rows = (await db.execute(
+        select(SalesDailyCategory.category, *totals(SalesDailyCategory))
+        .where(SalesDailyCategory.day.between(start, end))
+        .group_by(SalesDailyCategory.category)
+        .order_by(func.sum(SalesDailyCategory.revenue).desc())
+    )).all()
+    return rounded(rows)
+
+
+@router.get("/sales/products", response_model=List[schemas.ProductSales])
+async def product_sales(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(default=20, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    admin=Depends(require_admin),
+):
+    start, end = date_range(start, end)
+    top = (
+        select(SalesDailyProduct.product_id, *totals(SalesDailyProduct))
+        .where(SalesDailyProduct.day.between(start, end))
+        .group_by(SalesDailyProduct.product_id)
+        .order_by(func.sum(SalesDailyProduct.revenue).desc())
+        .limit(limit)
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(top.c.product_id, Product.name, top.c.orders, top.c.units, top.c.revenue)
+        .outerjoin(Product, Product.id == top.c.product_id)
+        .order_by(top.c.revenue.desc())
+    )).all()
+    return rounded(rows)
+
+
+@router.get("/status", response_model=schemas.RollupStatus)
+async def rollup_status(db: AsyncSession = Depends(get_read_db), admin=Depends(require_admin)):
+    state = (await db.execute(
+        select(RollupState.last_order_id, RollupState.updated_at).where(RollupState.name == STATE)
+    )).first()
+    return {
+        "last_order_id": state.last_order_id if state else 0,
+        "updated_at": state.updated_at if state else None,
+        "pending_orders": await pending_orders(db),
+    }
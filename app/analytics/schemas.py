@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+
+class SalesTotals(BaseModel):
+    orders: int
+    units: int
+    revenue: float
+
+
+class DailySales(SalesTotals):
+    day: date
+
+
+class CategorySales(SalesTotals):
+    category: str
+
+
+class ProductSales(SalesTotals):
+    product_id: int
+    name: Optional[str] = None  # None once the product is deleted
+
+
+class RollupStatus(BaseModel):
+    last_order_id: int
+    updated_at: Optional[datetime] = None
+    pending_orders: int
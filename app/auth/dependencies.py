@@ -1,33 +1,28 @@
 import logging
-from fastapi import Depends, HTTPException, status
+from typing import Union
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 
-from app.core.database import SessionLocal
+from app.core.database import get_db
+from app.core.replicas import SAFE_METHODS, read_session_scope
 from app.core.config import settings
-from app.auth import models
+from app.auth import models, schemas
+from app.auth.revocation import revocations
 
  
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
  
 security = HTTPBearer()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_current_user(
+async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> models.User:
+    db: AsyncSession = Depends(get_db)
+) -> Union[models.User, schemas.TokenData]:
     token = credentials.credentials
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,20 +37,39 @@ def get_current_user(
             logger.warning("JWT decode failed: 'sub' not found in payload")
             raise credentials_exception
     except JWTError as e:
-        logger.warning(f"JWT error: {e}")
+        logger.warning("JWT error: %s", e)
+        raise credentials_exception
+
+    if payload.get("type", "access") != "access":
+        logger.warning("Authentication failed: %s token used as access token", payload.get('type'))
+        raise credentials_exception
+
+    version = payload.get("ver")
+    if version is not None and revocations.is_stale(user_id, version):
+        logger.warning("Authentication failed: stale token for user '%s'", user_id)
         raise credentials_exception
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if request.method not in SAFE_METHODS:
+        request.state.writer_id = user_id  # ReplicaWriteMiddleware keeps their next reads off the replicas
+
+    # Tokens issued before claims carried email/ver still go through the DB
+    if settings.auth_trust_claims and version is not None and payload.get("email"):
+        return schemas.TokenData(id=user_id, email=payload["email"], role=payload.get("role"))
+
+    user = await db.get(models.User, user_id)
     if user is None:
-        logger.warning(f"Authentication failed: User with id '{user_id}' not found")
+        logger.warning("Authentication failed: User with id '%s' not found", user_id)
+        raise credentials_exception
+    if (version or 0) < user.token_version:
+        logger.warning("Authentication failed: stale token for user '%s'", user_id)
         raise credentials_exception
 
     return user
 
 
-def require_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
+async def require_admin(current_user=Depends(get_current_user)):
     if current_user.role != models.RoleEnum.admin:
-        logger.warning(f"Admin access denied for user: {current_user.email}")
+        logger.warning("Admin access denied for user: %s", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
@@ -63,11 +77,17 @@ def require_admin(current_user: models.User = Depends(get_current_user)) -> mode
     return current_user
 
 
-def require_user(current_user: models.User = Depends(get_current_user)) -> models.User:
+async def require_user(current_user=Depends(get_current_user)):
     if current_user.role != models.RoleEnum.user:
-        logger.warning(f"User-level access denied for user: {current_user.email}")
+        logger.warning("User-level access denied for user: %s", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User access required"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_user_read_db(current_user=Depends(require_user)):
+    """A read session for the signed-in user, on the primary right after their own writes."""
+    async with read_session_scope(current_user.id) as db:
+        yield db
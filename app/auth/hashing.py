@@ -0,0 +1,63 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import settings
+
+SCHEMES = ["argon2", "bcrypt"]
+
+# The configured scheme hashes new passwords; every other scheme, or a hash
+# made with a lower cost, is "deprecated" and gets rehashed on the next login.
+pwd_context = CryptContext(
+    schemes=[settings.password_hash_scheme] + [s for s in SCHEMES if s != settings.password_hash_scheme],
+    default=settings.password_hash_scheme,
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    argon2__time_cost=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost,
+)
+
+
+class HashingExecutor:
+    """Runs password hashing on a dedicated pool sized to the CPU.
+
+    bcrypt and argon2 release the GIL, so one thread per core keeps every core
+    busy without touching Starlette's request thread pool. At most
+    ``workers + queue_size`` hashes are admitted at once. Beyond that, callers
+    get a 503 immediately instead of queueing behind a login storm.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hashing")
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+
+    async def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+hashing_executor = HashingExecutor(settings.hashing_workers, settings.hashing_queue_size)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_executor.run(pwd_context.hash, password)
+
+
+async def verify_and_upgrade(password: str, hashed_password: str):
+    """Returns (valid, new_hash); new_hash is set when the stored hash should be replaced."""
+    return await hashing_executor.run(pwd_context.verify_and_update, password, hashed_password)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 import enum
@@ -17,6 +17,7 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(RoleEnum), default=RoleEnum.user, nullable=False)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
    
     carts = relationship("app.cart.models.Cart", back_populates="user")
@@ -31,4 +32,17 @@ class PasswordResetToken(Base):
     token = Column(String, nullable=False, unique=True)
     expiration_time = Column(DateTime, default=lambda: datetime.datetime.utcnow() + datetime.timedelta(minutes=30))
     used = Column(Boolean, default=False)
-    
\ No newline at end of file
+    
+
+
+class SpentRefreshToken(Base):
+    """Refresh tokens already exchanged; a second exchange means the token was replayed."""
+    __tablename__ = "spent_refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime, nullable=False)  # the token's own expiry; purged after it
+
+    __table_args__ = (
+        Index("ix_spent_refresh_tokens_expires_at", "expires_at"),
+    )
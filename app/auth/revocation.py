@@ -0,0 +1,44 @@
+import threading
+from app.core.broadcast import broadcaster
+
+CHANNEL = "token_versions"
+
+
+class TokenRevocations:
+    """In-process record of token versions.
+
+    Each user carries a ``token_version``. Password resets and role changes bump
+    it, and any token signed with an older version is treated as stale. The
+    check is a dict lookup, so the claims fast path never needs the database.
+    Bumps reach every worker through the broadcaster. Access tokens are
+    short-lived, so a worker that restarts (or misses a message) only accepts a
+    stale token until it expires. Refresh always re-checks the version stored
+    on the user row, and spent refresh tokens live only in the database, so a
+    replay is detected (and revokes the user's sessions) on every worker alike.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+
+    def bump(self, user_id: int, version: int):
+        with self._lock:
+            if version > self._versions.get(user_id, 0):
+                self._versions[user_id] = version
+
+    def is_stale(self, user_id: int, version: int) -> bool:
+        return version < self._versions.get(user_id, 0)
+
+    def receive(self, message):
+        # None: bumps may have been missed; refresh still checks the database
+        if message is None:
+            return
+        user_id, version = message.split(":")
+        self.bump(int(user_id), int(version))
+
+    async def announce(self, user_id: int, version: int):
+        """Make every worker treat tokens older than ``version`` as stale."""
+        await broadcaster.publish(CHANNEL, f"{user_id}:{version}")
+
+revocations = TokenRevocations()
+broadcaster.subscribe(CHANNEL, revocations.receive)
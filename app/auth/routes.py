@@ -1,15 +1,19 @@
 import logging
+import time
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from jose import JWTError
 from app.core.database import get_db
 from app.auth import schemas
 from app.auth.models import User
-from app.auth.utils import hash_password, verify_password, create_access_token
+from app.auth.utils import announce_revocation, create_token_pair, decode_token, revoke_user_tokens, spend_refresh_token
+from app.auth.hashing import hash_password_async, verify_and_upgrade
 from app.auth.models import PasswordResetToken
-from app.core.logger import logger
+from app.mail.outbox import enqueue_email, mail_worker
 from app.auth.utils import (
-    create_reset_token, verify_reset_token, mark_token_used, send_reset_email
+    create_reset_token, verify_reset_token, mark_token_used, reset_email
 )
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -17,76 +21,127 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 logger = logging.getLogger(__name__)
 
 @router.post("/signup", response_model=dict)
-def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    logger.info(f"Signup attempt for email: {user.email}")
-    existing = db.query(User).filter(User.email == user.email).first()
+async def signup(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    logger.info("Signup attempt for email: %s", user.email)
+    existing = (await db.execute(select(User).filter(User.email == user.email))).scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered.")
 
+    # give the connection back to the pool while the hash is computed
+    await db.close()
+    hashed_password = await hash_password_async(user.password)
+
     try:
         new_user = User(
             name=user.name,
             email=user.email,
-            hashed_password=hash_password(user.password),
+            hashed_password=hashed_password,
             role=user.role
         )
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
 
-        logger.info(f"New user created with ID: {new_user.id}")
+        logger.info("New user created with ID: %s", new_user.id)
         return {"message": "User registered successfully"}
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.exception("Signup failed due to DB error:")
         raise HTTPException(status_code=500, detail="Database error")
 
 @router.post("/signin", response_model=schemas.Token)
-def signin(data: schemas.UserLogin, db: Session = Depends(get_db)):
-    logger.info(f"Signin attempt for email: {data.email}")
-    user = db.query(User).filter(User.email == data.email).first()
-    if not user or not verify_password(data.password, user.hashed_password):
-        logger.warning(f"Signin failed: Invalid credentials for email - {data.email}")
+async def signin(data: schemas.UserLogin, db: AsyncSession = Depends(get_db)):
+    logger.info("Signin attempt for email: %s", data.email)
+    user = (await db.execute(select(User).filter(User.email == data.email))).scalars().first()
+    await db.close()
+    valid, new_hash = await verify_and_upgrade(data.password, user.hashed_password) if user else (False, None)
+    if not valid:
+        logger.warning("Signin failed: Invalid credentials for email - %s", data.email)
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = create_access_token({"sub": str(user.id), "role": user.role})
-    logger.info(f"User signed in: {user.email} (ID: {user.id})")
-    return {"access_token": token, "token_type": "bearer"}
+    if new_hash:
+        await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+        await db.commit()
+        logger.info("Password hash upgraded for user ID: %s", user.id)
+    tokens = create_token_pair(user)
+    logger.info("User signed in: %s (ID: %s)", user.email, user.id)
+    return tokens
+
+
+@router.post("/refresh", response_model=schemas.Token)
+async def refresh(data: schemas.RefreshRequest, db: AsyncSession = Depends(get_db)):
+    invalid = HTTPException(status_code=401, detail="Invalid refresh token")
+    try:
+        payload = decode_token(data.refresh_token)
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, ValueError):
+        raise invalid
+    jti = payload.get("jti")
+    if payload.get("type") != "refresh" or not jti:
+        logger.warning("Refresh rejected: token not usable for refresh (user %s)", payload.get('sub'))
+        raise invalid
+
+    user = await db.get(User, user_id)
+    if not user or payload.get("ver", 0) != user.token_version:
+        logger.warning("Refresh rejected: stale or unknown user %s", user_id)
+        raise invalid
+
+    # rotate: the presented refresh token cannot be used again, on any worker
+    expires_at = payload.get("exp", time.time())
+    if not await spend_refresh_token(db, user.id, jti, expires_at):
+        # a replayed refresh token may be stolen: end every session of the user
+        revoke_user_tokens(user)
+        await db.commit()
+        await announce_revocation(user)
+        logger.warning("Refresh token reuse for user %s; all of their tokens revoked", user.id)
+        raise invalid
+    await db.commit()
+    logger.info("Tokens refreshed for user ID: %s", user.id)
+    return create_token_pair(user)
 
 
 # reset and forgot password
 @router.post("/forgot-password", response_model=dict)
-def forgot_password(request: schemas.ForgotPasswordRequest, db: Session = Depends(get_db)):
-    logger.info(f"Password reset requested for email: {request.email}")
-    user = db.query(User).filter(User.email == request.email).first()
+async def forgot_password(request: schemas.ForgotPasswordRequest, db: AsyncSession = Depends(get_db)):
+    logger.info("Password reset requested for email: %s", request.email)
+    user = (await db.execute(select(User).filter(User.email == request.email))).scalars().first()
     if not user:
-        logger.warning(f"Password reset failed: User not found for email - {request.email}")
+        logger.warning("Password reset failed: User not found for email - %s", request.email)
         raise HTTPException(status_code=404, detail="User not found")
 
     try:
-        # Generate token and send email
-        token = create_reset_token(db, user.id)
-        send_reset_email(user.email, token)
-        logger.info(f"Password reset token sent to: {user.email}")
-        return {"message": "Password reset token sent to email."}
-    except Exception as e:
-        error_message = f"Email sending failed: {e.__class__.__name__}: {str(e)}"
-        logger.error(error_message)
-        raise HTTPException(status_code=500, detail=error_message)
+        # token and outbox message commit together; the mail worker sends it
+        token = await create_reset_token(db, user.id)
+        subject, body = reset_email(token)
+        enqueue_email(db, user.email, subject, body)
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Password reset failed for %s: %s: %s", user.email, e.__class__.__name__, e)
+        raise HTTPException(status_code=500, detail="Could not create reset token")
+
+    mail_worker.wake()
+    logger.info("Password reset email queued for: %s", user.email)
+    return {"message": "Password reset token sent to email."}
 
 @router.post("/reset-password", response_model=dict)
-def reset_password(request: schemas.ResetPasswordRequest, db: Session = Depends(get_db)):
+async def reset_password(request: schemas.ResetPasswordRequest, db: AsyncSession = Depends(get_db)):
     logger.info("Attempting to reset password using token")
-    token_record = verify_reset_token(db, request.token)
-    user = db.query(User).filter(User.id == token_record.user_id).first()
+    token_record = await verify_reset_token(db, request.token)
+    user = await db.get(User, token_record.user_id)
     if not user:
-        logger.error(f"Password reset failed: User not found for token {request.token}")
+        logger.error("Password reset failed: User not found for token %s", request.token)
         raise HTTPException(status_code=404, detail="User not found")
+
+    await db.close()
+    hashed_password = await hash_password_async(request.new_password)
+    db.add_all([user, token_record])
+
     # update the user password 
-    user.hashed_password = hash_password(request.new_password)
+    user.hashed_password = hashed_password
+    revoke_user_tokens(user)
 
     # mark token as used 
-    mark_token_used(db, token_record)
-    db.commit()
-    logger.info(f"Password successfully reset for user ID: {user.id}")
+    await mark_token_used(db, token_record)
+    await announce_revocation(user)
+    logger.info("Password successfully reset for user ID: %s", user.id)
     return {"message": "Password has been reset successfully."}
@@ -32,13 +32,19 @@ class UserOut(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
 class TokenData(BaseModel):
+    id: Optional[int] = None
     email: Optional[str] = None
     role: Optional[str] = None
 
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
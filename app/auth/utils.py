@@ -1,26 +1,21 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
-from app.auth.models import PasswordResetToken
+from app.auth.models import PasswordResetToken, SpentRefreshToken, User
+from app.auth.revocation import revocations
 from app.core.config import settings  
-import smtplib
-from email.message import EmailMessage
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.database import upsert
+from app.core.scheduler import scheduler
+from app.auth.hashing import pwd_context
 
 # Token settings from config
 SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
-
-# Email config from .env (via Pydantic settings)
-EMAIL_FROM = settings.email_from
-EMAIL_PASSWORD = settings.email_password
-SMTP_SERVER = settings.email_server
-SMTP_PORT = settings.email_port
+REFRESH_TOKEN_EXPIRE_MINUTES = settings.refresh_token_expire_minutes
 
 
 def hash_password(password: str) -> str:
@@ -38,7 +33,53 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def create_reset_token(db: Session, user_id: int) -> str:
+def create_token_pair(user: User) -> dict:
+    """Signed access + refresh tokens carrying everything the claims fast path needs."""
+    version = user.token_version or 0
+    access_token = create_access_token({
+        "sub": str(user.id),
+        "role": user.role,
+        "email": user.email,
+        "ver": version,
+        "type": "access",
+    })
+    refresh_token = create_access_token(
+        {"sub": str(user.id), "ver": version, "type": "refresh", "jti": uuid.uuid4().hex},
+        expires_delta=timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES),
+    )
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+def decode_token(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+def revoke_user_tokens(user: User):
+    """Invalidate every token issued to the user so far; the caller commits, then calls ``announce_revocation``."""
+    user.token_version = (user.token_version or 0) + 1
+    revocations.bump(user.id, user.token_version)
+
+
+async def announce_revocation(user: User):
+    await revocations.announce(user.id, user.token_version)
+
+
+async def spend_refresh_token(db: AsyncSession, user_id: int, jti: str, expires_at: float) -> bool:
+    """Record the refresh token as exchanged; False if it already was, i.e. it is being replayed.
+
+    The INSERT ... ON CONFLICT DO NOTHING makes a concurrent second exchange
+    wait for the first transaction and then see the conflict.
+    """
+    spent = (await db.execute(
+        upsert(db, SpentRefreshToken.__table__)
+        .values(jti=jti, user_id=user_id, expires_at=datetime.utcfromtimestamp(expires_at))
+        .on_conflict_do_nothing(index_elements=["jti"])
+        .returning(SpentRefreshToken.jti)
+    )).first()
+    return spent is not None
+
+
+async def create_reset_token(db: AsyncSession, user_id: int) -> str:
     token = str(uuid.uuid4())
     expiration = datetime.utcnow() + timedelta(minutes=15)
     reset_token = PasswordResetToken(
@@ -48,30 +89,54 @@ def create_reset_token(db: Session, user_id: int) -> str:
         used=False
     )
     db.add(reset_token)
-    db.commit()
-    db.refresh(reset_token)
     #print(f" Generated reset token: {token}")
     return token
 
 
-def verify_reset_token(db: Session, token: str) -> PasswordResetToken:
+async def verify_reset_token(db: AsyncSession, token: str) -> PasswordResetToken:
     #print(f" Verifying token: {token}")
-    record = db.query(PasswordResetToken).filter_by(token=token, used=False).first()
+    record = (await db.execute(
+        select(PasswordResetToken).filter_by(token=token, used=False)
+    )).scalars().first()
     #print(f" Token record found: {record}")
     if not record or record.expiration_time < datetime.utcnow():
         raise HTTPException(status_code=400, detail="Invalid or expired token.")
     return record
 
 
-def mark_token_used(db: Session, token_record: PasswordResetToken):
+async def mark_token_used(db: AsyncSession, token_record: PasswordResetToken):
     token_record.used = True
-    db.commit()
+    await db.commit()
+
+
+async def purge_reset_tokens(db: AsyncSession, limit: int) -> int:
+    """Delete up to ``limit`` reset tokens that are used or past their expiration."""
+    done = select(PasswordResetToken.id).where(
+        or_(PasswordResetToken.used.is_(True), PasswordResetToken.expiration_time < datetime.utcnow())
+    ).limit(limit)
+    result = await db.execute(
+        delete(PasswordResetToken).where(PasswordResetToken.id.in_(done)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+scheduler.register("reset_tokens", purge_reset_tokens)
 
 
-def send_reset_email(email: str, token: str) -> str:
-    # print("Using server:", SMTP_SERVER)
-    # print("From:", EMAIL_FROM)
-    # print("Password:", EMAIL_PASSWORD)
+async def purge_spent_refresh_tokens(db: AsyncSession, limit: int) -> int:
+    """Delete up to ``limit`` spent refresh tokens that have expired and can no longer be presented."""
+    expired = select(SpentRefreshToken.jti).where(SpentRefreshToken.expires_at < datetime.utcnow()).limit(limit)
+    result = await db.execute(
+        delete(SpentRefreshToken).where(SpentRefreshToken.jti.in_(expired)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+scheduler.register("spent_refresh_tokens", purge_spent_refresh_tokens)
+
+
+def reset_email(token: str) -> tuple:
+    """Subject and body of the password reset message."""
     reset_link = f"http://localhost:8000/auth/reset-password?token={token}"
     subject = "Reset Your Password"
     body = f"""
@@ -87,21 +152,4 @@ def send_reset_email(email: str, token: str) -> str:
 
     - Your App Team
     """
-
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = EMAIL_FROM
-    msg["To"] = email
-    msg.set_content(body)
-
-    try:
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as smtp:
-            smtp.starttls()
-            smtp.login(EMAIL_FROM, EMAIL_PASSWORD)
-            smtp.send_message(msg)
-    except Exception as e:
-        error_detail = f"Email sending failed: {e.__class__.__name__}: {str(e)}"
-        print(error_detail)
-        raise HTTPException(status_code=500, detail=error_detail)
-    #print(f" Email sent with reset link: {reset_link}")
-    return reset_link
+    return subject, body
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+from sqlalchemy import select, delete, exists, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.cart.models import Cart
+from app.core.config import settings
+from app.core.database import upsert
+from app.core.scheduler import scheduler
+from app.products.models import Product
+
+carts = Cart.__table__
+
+
+async def add_item(db: AsyncSession, user_id: int, product_id: int, quantity: int):
+    """Add to the cart with one INSERT ... SELECT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+    The SELECT only yields a row when the product exists with enough stock, so
+    no returned row means the add was refused; only then is the product read
+    again to tell a 404 from a 400. The caller owns the transaction.
+    """
+    source = (
+        select(literal(user_id), Product.id, literal(quantity), literal(datetime.utcnow()))
+        .where(Product.id == product_id, Product.stock >= quantity)
+    )
+    statement = upsert(db, carts).from_select(["user_id", "product_id", "quantity", "updated_at"], source)
+    statement = statement.on_conflict_do_update(
+        index_elements=[carts.c.user_id, carts.c.product_id],
+        set_={"quantity": carts.c.quantity + statement.excluded.quantity, "updated_at": statement.excluded.updated_at},
+    ).returning(carts.c.id, carts.c.product_id, carts.c.quantity)
+
+    row = (await db.execute(statement)).first()
+    if row is None:
+        stock = await db.scalar(select(Product.stock).where(Product.id == product_id))
+        if stock is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient stock")
+    return row
+
+
+async def apply_operations(db: AsyncSession, user_id: int, operations) -> dict:
+    """Fold a batch of add/set/remove operations into the cart in one transaction.
+
+    Operations apply in order, so only the final quantity of each product is
+    written: one upsert for the lines that remain and one DELETE for the ones
+    that drop to zero, whatever the batch size. Returns the resulting cart view.
+    The caller owns the transaction.
+    """
+    product_ids = sorted({operation.product_id for operation in operations})
+    stock = dict((await db.execute(
+        select(Product.id, Product.stock).where(Product.id.in_(product_ids))
+    )).all())
+    current = dict((await db.execute(
+        select(Cart.product_id, Cart.quantity)
+        .where(Cart.user_id == user_id, Cart.product_id.in_(product_ids))
+        .with_for_update()
+    )).all())
+
+    quantities = dict(current)
+    for operation in operations:
+        if operation.op == "add":
+            quantities[operation.product_id] = quantities.get(operation.product_id, 0) + operation.quantity
+        elif operation.op == "set":
+            quantities[operation.product_id] = operation.quantity
+        else:
+            quantities[operation.product_id] = 0
+
+    changed = {
+        product_id: quantity for product_id, quantity in quantities.items()
+        if current.get(product_id, 0) != max(quantity, 0)
+    }
+    keep = {product_id: quantity for product_id, quantity in changed.items() if quantity > 0}
+    drop = [product_id for product_id, quantity in changed.items() if quantity <= 0]
+
+    missing = sorted(product_id for product_id in keep if product_id not in stock)
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Products not found: {missing}")
+    short = sorted(product_id for product_id, quantity in keep.items() if stock[product_id] < quantity)
+    if short:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient stock for products: {short}")
+
+    if keep:
+        statement = upsert(db, carts)
+        statement = statement.on_conflict_do_update(
+            index_elements=[carts.c.user_id, carts.c.product_id],
+            set_={"quantity": statement.excluded.quantity, "updated_at": statement.excluded.updated_at},
+        )
+        now = datetime.utcnow()
+        await db.execute(statement, [
+            {"user_id": user_id, "product_id": product_id, "quantity": quantity, "updated_at": now}
+            for product_id, quantity in keep.items()
+        ])
+    if drop:
+        await db.execute(delete(carts).where(carts.c.user_id == user_id, carts.c.product_id.in_(drop)))
+
+    return await load_cart_view(db, user_id)
+
+
+async def load_cart_view(db: AsyncSession, user_id: int) -> dict:
+    """The cart joined to its products in one statement, with line totals and stock status."""
+    lines = (await db.execute(
+        select(
+            Cart.id,
+            Cart.product_id,
+            Product.name,
+            Product.image_url,
+            Product.price.label("unit_price"),
+            Cart.quantity,
+            (Product.price * Cart.quantity).label("line_total"),
+            (Product.stock >= Cart.quantity).label("in_stock"),
+        )
+        .join(Product, Product.id == Cart.product_id)
+        .where(Cart.user_id == user_id)
+        .order_by(Cart.id)
+    )).all()
+    items = [{**line._mapping, "line_total": round(line.line_total, 2)} for line in lines]
+    return {
+        "items": items,
+        "subtotal": round(sum(item["line_total"] for item in items), 2),
+        "item_count": sum(line.quantity for line in lines),
+        "all_in_stock": all(line.in_stock for line in lines),
+    }
+
+
+async def purge_abandoned_carts(db: AsyncSession, limit: int) -> int:
+    """Delete up to ``limit`` lines of carts whose lines were all untouched for ``cart_idle_days``.
+
+    A big cart can span batches; its remaining lines are still idle, so the
+    next batch takes them.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.cart_idle_days)
+    fresh = aliased(Cart)
+    idle_lines = (
+        select(Cart.id)
+        .where(Cart.updated_at < cutoff)
+        .where(~exists().where(fresh.user_id == Cart.user_id, fresh.updated_at >= cutoff))
+        .order_by(Cart.id)
+        .limit(limit)
+    )
+    result = await db.execute(
+        delete(Cart).where(Cart.id.in_(idle_lines)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+scheduler.register("abandoned_carts", purge_abandoned_carts)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, ForeignKey
+import datetime
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -9,6 +10,13 @@ class Cart(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     product_id = Column(Integer, ForeignKey("products.id"))
     quantity = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, nullable=False)
 
     user = relationship("app.auth.models.User", back_populates="carts")
-    product = relationship("app.products.models.Product")
\ No newline at end of file
+    product = relationship("app.products.models.Product")
+
+    # one row per product per cart; adds upsert onto it
+    __table_args__ = (
+        Index("ix_carts_user_id_product_id", "user_id", "product_id", unique=True),
+        Index("ix_carts_updated_at", "updated_at"),  # for the abandoned cart purge
+    )
@@ -1,102 +1,142 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import logging
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
+from app.core.serialization import dump_models
 from app.cart import schemas
 from app.products.models import Product
 from app.cart.models import Cart as CartItem
-from app.auth.dependencies import require_user
+from app.cart.engine import add_item, apply_operations, load_cart_view
+from app.auth.dependencies import get_user_read_db, require_user
+from app.idempotency.keys import claim_key, remember_response
 from typing import Union
 
-from app.core.logger import logger
-
 router = APIRouter(prefix="/cart", tags=["Cart"])
 
+logger = logging.getLogger(__name__)
+
 @router.post("/", response_model=schemas.CartOut)
-def add_to_cart(data: schemas.CartAdd, db: Session = Depends(get_db), user=Depends(require_user)):
-    logger.info(f"Add to cart request by user {user.id} for product {data.product_id} (qty: {data.quantity})")
-   
-    # check if procduct is available
-    product = db.query(Product).filter(Product.id == data.product_id).first()
-
-    if not product:
-        logger.warning(f"Product {data.product_id} not found for user {user.id}")
-        raise HTTPException(status_code=404, detail="Product not found")
-    if product.stock < data.quantity:
-        logger.warning(f"Insufficient stock for product {data.product_id} requested by user {user.id}")
-        raise HTTPException(status_code=400, detail="Insufficient stock")
+async def add_to_cart(
+    data: schemas.CartAdd, request: Request, db: AsyncSession = Depends(get_db), user=Depends(require_user)
+):
+    logger.info("Add to cart request by user %s for product %s (qty: %s)", user.id, data.product_id, data.quantity)
 
-    # check if a product is already in cart
-    cart_item = db.query(CartItem).filter_by(user_id=user.id, product_id=data.product_id).first()
-    if cart_item:
-        cart_item.quantity += data.quantity
-        logger.info(f"Updated cart quantity for product {data.product_id} (new qty: {cart_item.quantity})")
-    else:
-        cart_item = CartItem(user_id=user.id, product_id=data.product_id, quantity=data.quantity)
-       
-        db.add(cart_item)
-        logger.info(f"Added product {data.product_id} to cart for user {user.id}")
+    try:
+        # adding is not idempotent: a retry would add the quantity twice
+        replay = await claim_key(db, user.id, request)
+        if replay is not None:
+            return replay
+        cart_item = await add_item(db, user.id, data.product_id, data.quantity)
+        response = await remember_response(db, user.id, request, dump_models(schemas.CartOut, cart_item))
+        await db.commit()
+    except HTTPException as e:
+        await db.rollback()
+        logger.warning("Add to cart refused for user %s, product %s: %s", user.id, data.product_id, e.detail)
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("Database commit failed when adding to cart for user %s: %s", user.id, e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Database commit failed")
+
+    logger.info("Cart updated successfully for user %s (product %s, qty: %s)", user.id, data.product_id, cart_item.quantity)
+    return response
+
+
+@router.patch("/", response_model=schemas.CartView)
+async def update_cart(
+    data: schemas.CartBatch, request: Request, db: AsyncSession = Depends(get_db), user=Depends(require_user)
+):
+    logger.info("User %s applying %s cart operations", user.id, len(data.operations))
 
     try:
-        db.commit()
-    except Exception as e:   
-        db.rollback()
-        logger.error(f"Database commit failed when adding to cart for user {user.id}: {e}", exc_info=True)
+        replay = await claim_key(db, user.id, request)
+        if replay is not None:
+            return replay
+        cart = await apply_operations(db, user.id, data.operations)
+        response = await remember_response(db, user.id, request, dump_models(schemas.CartView, cart, from_attributes=False))
+        await db.commit()
+    except HTTPException as e:
+        await db.rollback()
+        logger.warning("Cart operations refused for user %s: %s", user.id, e.detail)
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("Database commit failed when applying cart operations for user %s: %s", user.id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Database commit failed")
 
-    db.refresh(cart_item)
-    logger.info(f"Cart updated successfully for user {user.id}")
-    return cart_item
+    logger.info("Cart synced for user %s (%s lines)", user.id, len(cart['items']))
+    return response
 
 
-@router.get("/", response_model=list[schemas.CartOut])
-def view_cart(db: Session = Depends(get_db), user=Depends(require_user)):
-    logger.info(f"User {user.id} requested to view cart")
-    return db.query(CartItem).filter_by(user_id=user.id).all()
+@router.get("/", response_model=schemas.CartView)
+async def view_cart(db: AsyncSession = Depends(get_user_read_db), user=Depends(require_user)):
+    logger.info("User %s requested to view cart", user.id)
+    return await load_cart_view(db, user.id)
 
 
 @router.put("/{product_id}", response_model=Union[schemas.CartOut, dict])
-def update_cart_quantity(
+async def update_cart_quantity(
     product_id: int,
     data: schemas.CartUpdate,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     user=Depends(require_user)
 ):
     # check if item is present in cart
-    logger.info(f"User {user.id} is updating cart for product {product_id} to qty: {data.quantity}")
-    item = db.query(CartItem).filter_by(user_id=user.id, product_id=product_id).first()
+    logger.info("User %s is updating cart for product %s to qty: %s", user.id, product_id, data.quantity)
+    replay = await claim_key(db, user.id, request)
+    if replay is not None:
+        return replay
+    item = (await db.execute(
+        select(CartItem).filter_by(user_id=user.id, product_id=product_id)
+    )).scalars().first()
     if not item:
-        logger.warning(f"Cart update failed: Item not found (User: {user.id}, Product: {product_id})")
+        logger.warning("Cart update failed: Item not found (User: %s, Product: %s)", user.id, product_id)
         raise HTTPException(status_code=404, detail="Item not found in cart")
 
     if data.quantity <= 0:
-        db.delete(item)
-        db.commit()
-        logger.info(f"Item removed from cart due to zero quantity (User: {user.id}, Product: {product_id})")
-        return {"detail": "Item removed from cart due to zero quantity"}
+        await db.delete(item)
+        response = await remember_response(
+            db, user.id, request, orjson.dumps({"detail": "Item removed from cart due to zero quantity"})
+        )
+        await db.commit()
+        logger.info("Item removed from cart due to zero quantity (User: %s, Product: %s)", user.id, product_id)
+        return response
 
     # check product's stock
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product or product.stock < data.quantity:
-        logger.warning(f"Cart update failed: Insufficient stock (User: {user.id}, Product: {product_id})")
+        logger.warning("Cart update failed: Insufficient stock (User: %s, Product: %s)", user.id, product_id)
         raise HTTPException(status_code=400, detail="Insufficient stock")
 
     #update the qunatity
     item.quantity = data.quantity
-    db.commit()
-    db.refresh(item)
-    logger.info(f"Cart quantity updated (User: {user.id}, Product: {product_id}, Qty: {data.quantity})")
-    return item
+    response = await remember_response(db, user.id, request, dump_models(schemas.CartOut, item))
+    await db.commit()
+    logger.info("Cart quantity updated (User: %s, Product: %s, Qty: %s)", user.id, product_id, data.quantity)
+    return response
 
 
 @router.delete("/{product_id}")
-def remove_from_cart(product_id: int, db: Session = Depends(get_db), user=Depends(require_user)):
-    logger.info(f"User {user.id} requested to remove product {product_id} from cart")
-    item = db.query(CartItem).filter_by(user_id=user.id, product_id=product_id).first()
+async def remove_from_cart(
+    product_id: int, request: Request, db: AsyncSession = Depends(get_db), user=Depends(require_user)
+):
+    logger.info("User %s requested to remove product %s from cart", user.id, product_id)
+    # a retry after success replays 200 instead of answering 404
+    replay = await claim_key(db, user.id, request)
+    if replay is not None:
+        return replay
+    item = (await db.execute(
+        select(CartItem).filter_by(user_id=user.id, product_id=product_id)
+    )).scalars().first()
     if not item:
-        logger.warning(f"Remove from cart failed: Item not found (User: {user.id}, Product: {product_id})")
+        logger.warning("Remove from cart failed: Item not found (User: %s, Product: %s)", user.id, product_id)
         raise HTTPException(status_code=404, detail="Item not found in cart")
     
-    db.delete(item)
-    db.commit()
-    logger.info(f"Product {product_id} removed from cart (User: {user.id})")
-    return {"detail": "Item removed from cart"}
\ No newline at end of file
+    await db.delete(item)
+    response = await remember_response(db, user.id, request, orjson.dumps({"detail": "Item removed from cart"}))
+    await db.commit()
+    logger.info("Product %s removed from cart (User: %s)", product_id, user.id)
+    return response
\ No newline at end of file
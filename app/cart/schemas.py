@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 class CartAdd(BaseModel):
     product_id: int
@@ -14,8 +14,39 @@ class CartOut(BaseModel):
         from_attribute = True
 
 
+class CartLineOut(BaseModel):
+    id: int
+    product_id: int
+    name: str
+    image_url: Optional[str] = None
+    unit_price: float
+    quantity: int
+    line_total: float
+    in_stock: bool
+
+    class Config:
+        from_attributes = True
+
+
+class CartView(BaseModel):
+    items: List[CartLineOut]
+    subtotal: float
+    item_count: int
+    all_in_stock: bool
+
+
 class CartUpdate(BaseModel):
     quantity: int
 
     class Config:
-        from_attribute = True
\ No newline at end of file
+        from_attribute = True
+
+
+class CartOperation(BaseModel):
+    op: Literal["add", "set", "remove"]
+    product_id: int
+    quantity: int = Field(default=0, ge=0, description="Ignored for remove; set to 0 removes the line")
+
+
+class CartBatch(BaseModel):
+    operations: List[CartOperation] = Field(..., min_length=1, max_length=500)
@@ -0,0 +1,140 @@
+from datetime import datetime
+from fastapi import HTTPException, status
+from sqlalchemy import select, insert, update, delete, case, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cart.models import Cart
+from app.core.config import settings
+from app.core.database import sqlstate
+from app.orders import models as order_models
+from app.products.models import Product
+
+
+# lock_not_available (lock_timeout) and deadlock_detected; ordered locking makes the latter rare
+LOCK_CONFLICTS = {"55P03", "40P01"}
+
+
+async def set_lock_timeout(db: AsyncSession):
+    """Bound how long this transaction queues for row locks (PostgreSQL only)."""
+    if db.bind.dialect.name == "postgresql" and settings.checkout_lock_timeout_ms > 0:
+        await db.execute(text(f"SET LOCAL lock_timeout = {int(settings.checkout_lock_timeout_ms)}"))
+
+
+async def decrement_stock(db: AsyncSession, quantities: dict) -> dict:
+    """Take ``quantities`` (product id -> quantity) out of stock in one conditional UPDATE.
+
+    ``stock >= quantity`` is checked by the UPDATE itself, so concurrent
+    buyers can never oversell. The rows are locked first with
+    ``SELECT ... ORDER BY id FOR UPDATE``: a multi-row UPDATE locks in scan
+    order, and two carts sharing products would otherwise deadlock.
+    Returns id -> row with the price and category, or raises 404/400 naming the first
+    product that could not be decremented; the caller must then roll back.
+    """
+    product_ids = sorted(quantities)
+    needed = case(quantities, value=Product.id)
+    await set_lock_timeout(db)
+    try:
+        existing = set((await db.scalars(
+            select(Product.id).where(Product.id.in_(product_ids)).order_by(Product.id).with_for_update()
+        )).all())
+        result = await db.execute(
+            update(Product)
+            .where(Product.id.in_(product_ids), Product.stock >= needed)
+            .values(stock=Product.stock - needed)
+            .returning(Product.id, Product.price, Product.category)
+            .execution_options(synchronize_session=False)
+        )
+    except DBAPIError as e:
+        if sqlstate(e) in LOCK_CONFLICTS:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Product is in high demand, please retry",
+                headers={"Retry-After": "1"},
+            )
+        raise
+    products = {row.id: row for row in result}
+    if len(products) == len(product_ids):
+        return products
+
+    # refused: work out why, for the first product that was not decremented
+    refused = [pid for pid in product_ids if pid not in products]
+    for product_id in refused:
+        if product_id not in existing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Product ID {product_id} not found"
+            )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Not enough stock for Product ID {refused[0]}"
+    )
+
+
+async def place_order(db: AsyncSession, user_id: int) -> dict:
+    """Turn the user's cart into a paid order using set-based statements.
+
+    Every statement touches all cart lines at once, so the number of round
+    trips does not grow with the cart size. The cart is emptied first with
+    DELETE ... RETURNING, so product rows are only locked, in id order, for
+    the conditional decrement and the two order INSERTs until the caller
+    commits. The caller owns the transaction and must commit or roll back.
+    """
+    cart_rows = (await db.execute(
+        delete(Cart)
+        .where(Cart.user_id == user_id)
+        .returning(Cart.product_id, Cart.quantity)
+        .execution_options(synchronize_session=False)
+    )).all()
+    if not cart_rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cart is empty")
+
+    quantities = {}
+    for product_id, quantity in cart_rows:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    product_ids = sorted(quantities)
+    products = await decrement_stock(db, quantities)
+
+    total_amount = sum(products[pid].price * quantities[pid] for pid in product_ids)
+    order = (await db.execute(
+        insert(order_models.Order)
+        .values(
+            user_id=user_id,
+            total_amount=total_amount,
+            status=order_models.OrderStatus.paid,
+            created_at=datetime.utcnow(),
+        )
+        .returning(order_models.Order.id, order_models.Order.status)
+    )).one()
+
+    items = (await db.execute(
+        insert(order_models.OrderItem).returning(
+            order_models.OrderItem.product_id,
+            order_models.OrderItem.quantity,
+            order_models.OrderItem.price_at_purchase,
+        ),
+        [
+            {
+                "order_id": order.id,
+                "product_id": pid,
+                "quantity": quantities[pid],
+                "price_at_purchase": products[pid].price,
+                "category": products[pid].category,
+            }
+            for pid in product_ids
+        ],
+    )).all()
+
+    return {
+        "order_id": order.id,
+        "total_amount": total_amount,
+        "items": [
+            {
+                "product_id": item.product_id,
+                "quantity": item.quantity,
+                "price_at_purchase": item.price_at_purchase,
+            }
+            for item in items
+        ],
+        "status": order.status.value,
+    }
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBroadcaster:
+    """Delivers messages to subscribers in this process only.
+
+    Fine for a single worker and for tests. Subscribers are plain callables
+    taking the message string, or ``None`` when they should drop everything
+    they hold because messages may have been missed.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+
+    def subscribe(self, channel: str, callback):
+        self._subscribers[channel].append(callback)
+
+    def deliver(self, channel: str, message):
+        for callback in self._subscribers[channel]:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Broadcast subscriber failed on channel %s", channel)
+
+    def deliver_all(self, message):
+        for channel in list(self._subscribers):
+            self.deliver(channel, message)
+
+    async def publish(self, channel: str, message: str):
+        self.deliver(channel, message)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class PostgresBroadcaster(LocalBroadcaster):
+    """Fans messages out to every worker through PostgreSQL LISTEN/NOTIFY.
+
+    The publishing worker delivers locally right away and skips its own echo.
+    After the listening connection drops, every subscriber is reset, because
+    notifications sent while it was down are lost.
+    """
+
+    def __init__(self, database_url: str, reconnect_delay: float = 1.0):
+        super().__init__()
+        self._dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._origin = uuid.uuid4().hex
+        self._reconnect_delay = reconnect_delay
+        self._connection = None
+        self._task = None
+        self._publish_lock = asyncio.Lock()
+
+    async def publish(self, channel: str, message: str):
+        self.deliver(channel, message)
+        if self._connection is None or self._connection.is_closed():
+            logger.warning("Broadcast on %s not sent: listener connection is down", channel)
+            return
+        async with self._publish_lock:
+            await self._connection.execute("SELECT pg_notify($1, $2)", channel, f"{self._origin}:{message}")
+
+    def _on_notify(self, connection, pid, channel, payload):
+        origin, _, message = payload.partition(":")
+        if origin != self._origin:
+            self.deliver(channel, message)
+
+    async def _listen(self):
+        import asyncpg
+
+        while True:
+            try:
+                self._connection = await asyncpg.connect(self._dsn)
+                for channel in list(self._subscribers):
+                    await self._connection.add_listener(channel, self._on_notify)
+                self.deliver_all(None)
+                logger.info("Broadcast listener connected")
+                while not self._connection.is_closed():
+                    await asyncio.sleep(self._reconnect_delay)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Broadcast listener error: %s: %s", e.__class__.__name__, e)
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+
+
+def create_broadcaster():
+    if settings.cache_broadcast == "postgres":
+        return PostgresBroadcaster(settings.DATABASE_URL)
+    return LocalBroadcaster()
+
+
+broadcaster = create_broadcaster()
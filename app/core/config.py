@@ -1,16 +1,69 @@
+from typing import List
 from pydantic_settings import BaseSettings
 from pydantic import EmailStr
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    async_db: bool = True  # False serves requests through the sync engine in the thread pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds; -1 keeps connections forever
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # 0 disables (PostgreSQL only)
+    db_lock_timeout_ms: int = 0  # 0 disables (PostgreSQL only)
+    database_replica_urls: List[str] = []  # read replicas for GET routes, as a JSON list
+    replica_read_your_writes_seconds: float = 5  # a user's reads stay on the primary this long after a write
+    replica_retry_seconds: float = 30  # an unreachable replica is skipped this long
+    idempotency_ttl_hours: int = 24  # how long a stored response can be replayed for its Idempotency-Key
+    checkout_lock_timeout_ms: int = 2000  # wait for a hot product's row lock, then 503 (PostgreSQL only)
+    cart_idle_days: int = 30  # carts untouched this long are deleted by maintenance
+    maintenance_enabled: bool = True  # purge jobs on the worker holding the advisory lock
+    maintenance_interval: float = 3600  # default seconds between runs of a maintenance job
+    maintenance_batch_size: int = 1000  # rows deleted (or orders rolled up) per transaction
+    analytics_rollup_interval: float = 60  # seconds between sales rollup runs
+    analytics_settle_seconds: float = 30  # orders younger than this wait for the next rollup run
     email_from: EmailStr
     email_password: str
     email_server: str
     email_port: int
+    email_starttls: bool = True  # off for a plain local SMTP stand-in
+    email_login: bool = True
+    mail_batch_size: int = 50  # outbox messages sent per SMTP connection checkout
+    mail_poll_interval: float = 5  # seconds between outbox scans when nothing wakes the worker
+    mail_max_attempts: int = 8  # then the message is marked failed
+    mail_retry_base: float = 30  # seconds; doubles with every failed attempt
+    mail_retry_max: float = 3600
+    mail_lease_seconds: float = 300  # a claimed batch is retried after this if its worker never reports back
+    mail_retention_days: int = 7  # sent and failed outbox rows are deleted after this
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
     refresh_token_expire_minutes: int
+    auth_trust_claims: bool = True  # skip the per-request user lookup for signed access tokens
+    password_hash_scheme: str = "bcrypt"  # "bcrypt" or "argon2"; older hashes are upgraded on login
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    hashing_workers: int = 0  # 0 means one per CPU core
+    hashing_queue_size: int = 64  # hashes allowed to wait before shedding load with 503
+    catalog_cache_size: int = 10000  # entries per cache (product detail, list pages)
+    catalog_cache_ttl: float = 60  # seconds
+    facet_price_edges: List[float] = [10, 25, 50, 100, 250, 500, 1000]  # bucket bounds of the /products/facets price histogram
+    cache_broadcast: str = "local"  # "postgres" fans invalidations out to all workers via LISTEN/NOTIFY
+    import_chunk_size: int = 2000  # rows validated and upserted per transaction
+    export_chunk_size: int = 1000  # rows fetched per server-side cursor round trip
+    log_level: str = "INFO"
+    log_json: bool = True  # False keeps the plain "time | level | message" lines
+    log_file: str = "app.log"  # empty logs to the console only
+    log_max_bytes: int = 10 * 1024 * 1024  # rotate app.log at this size
+    log_backup_count: int = 5
+    log_queue_size: int = 10000  # records waiting for the writer thread; overflow is dropped
+    log_sample_rates: dict = {}  # logger name -> share of INFO records kept, e.g. {"app.cart.routes": 0.1}
+    metrics_enabled: bool = True  # Prometheus middleware, DB hooks and /metrics
+    sql_profiler: bool = False  # per-request statement grouping, N+1 warnings and the X-DB-Profile header
+    sql_nplus1_threshold: int = 5  # same statement more often than this in one request is flagged
+    sql_slow_query_ms: float = 200  # statements at least this slow are logged with their parameters
 
     class Config:
         env_file = ".env"
@@ -1,14 +1,205 @@
-from sqlalchemy import create_engine #Used to connect to DB
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event #Used to connect to DB
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base #ORM utilities for sessions and models
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from app.core.metrics import instrument_engine, register_pool_collector
+from app.core.profiler import profile_engine
 
-engine = create_engine(settings.DATABASE_URL) #Create SQLAlchemy engine using PostgreSQL URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in DATABASE_URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Pool settings from Settings; in-memory SQLite keeps SQLAlchemy's own pool."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def apply_session_timeouts(sync_engine):
+    """Run SET statement_timeout / lock_timeout on every new PostgreSQL connection."""
+    if sync_engine.dialect.name != "postgresql":
+        return
+    timeouts = {
+        "statement_timeout": settings.db_statement_timeout_ms,
+        "lock_timeout": settings.db_lock_timeout_ms,
+    }
+    statements = [f"SET {name} = {int(value)}" for name, value in timeouts.items() if value > 0]
+    if not statements:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_timeouts(dbapi_connection, connection_record):
+        # autocommit so the SETs are not undone by the pool's reset-on-return rollback
+        autocommit = dbapi_connection.autocommit
+        dbapi_connection.autocommit = True
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+        dbapi_connection.autocommit = autocommit
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL)) #Create SQLAlchemy engine using PostgreSQL URL
+apply_session_timeouts(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) #Create a DB session factory
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+async_engine = None
+if settings.async_db:
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        **engine_options(settings.DATABASE_URL, is_async=True)
+    )
+    apply_session_timeouts(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+class ThreadedSession:
+    """Sync Session behind the subset of the AsyncSession API the routers use.
+
+    Every database call is pushed to Starlette's thread pool, which is how the
+    service behaved before the async port. Selected with ``async_db=False`` so
+    the two paths can be compared under the same load.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.get_bind()
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def connection(self):
+        return await run_in_threadpool(self.sync_session.connection)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+def active_engine():
+    """The engine request sessions are bound to under the current settings."""
+    return async_engine.sync_engine if settings.async_db else engine
+
+
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    register_pool_collector(active_engine)
+
+if settings.sql_profiler:
+    profile_engine(engine)
+    if async_engine is not None:
+        profile_engine(async_engine.sync_engine)
+
+
+@asynccontextmanager
+async def session_scope():
+    """A request-style session outside of dependency injection (streams, background jobs)."""
+    if settings.async_db:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    db = ThreadedSession(SessionLocal(expire_on_commit=False))
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        await db.close()
+
+
+async def stream_rows(db, statement, chunk_size: int = 1000):
+    """Yield lists of rows from a server-side cursor, ``chunk_size`` rows at a time."""
+    statement = statement.execution_options(yield_per=chunk_size)
+    if isinstance(db, AsyncSession):
+        result = await db.stream(statement)
+        async for partition in result.partitions():
+            yield partition
+        return
+
+    result = await db.execute(statement)
+    while True:
+        partition = await run_in_threadpool(result.fetchmany, chunk_size)
+        if not partition:
+            break
+        yield partition
+
+
+def sqlstate(error) -> str:
+    """The SQLSTATE code of a DBAPIError from psycopg2 or asyncpg, when there is one."""
+    orig = getattr(error, "orig", None)
+    return getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+
+
+def upsert(db, table):
+    """An INSERT for the session's dialect that supports ON CONFLICT ... DO UPDATE."""
+    dialect = db.bind.dialect.name
+    insert_fn = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect)
+    if insert_fn is None:
+        raise NotImplementedError(f"INSERT ... ON CONFLICT is not supported on {dialect}")
+    return insert_fn(table)
+
+
+async def get_db():
+    async with session_scope() as db:
+        yield db
@@ -1,12 +1,122 @@
+import atexit
 import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pythonjsonlogger import jsonlogger
+from app.core.config import settings
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+JSON_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
 
-logger = logging.getLogger("fastapi-ecommerce")
\ No newline at end of file
+logger = logging.getLogger("fastapi-ecommerce")
+
+_listener = None
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of INFO-and-below records from chatty loggers.
+
+    ``rates`` maps a logger name to the share of records to keep; a name also
+    covers its children. Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or not self.rates:
+            return True
+        name = record.name
+        while name:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return random.random() < rate
+            name = name.rpartition(".")[0]
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread without formatting or waiting.
+
+    Formatting happens on the listener thread, so arguments passed to a log
+    call must not be mutated afterwards. When the queue is full the record
+    is dropped and counted rather than blocking the request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class FormatOnce(logging.Formatter):
+    """Shares one rendering of a record between all of the listener's handlers.
+
+    Only the listener thread formats, one record at a time, so remembering
+    the last record is enough.
+    """
+
+    def __init__(self, formatter: logging.Formatter):
+        super().__init__()
+        self.formatter = formatter
+        self._record = None
+        self._text = None
+
+    def format(self, record):
+        if record is not self._record:
+            self._text = self.formatter.format(record)
+            self._record = record
+        return self._text
+
+
+def build_formatter() -> logging.Formatter:
+    if settings.log_json:
+        return FormatOnce(jsonlogger.JsonFormatter(JSON_FORMAT))
+    return FormatOnce(logging.Formatter(TEXT_FORMAT))
+
+
+def configure_logging():
+    """Route every log record through a queue to file and console handlers on a background thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = build_formatter()
+    handlers = [logging.StreamHandler()]
+    if settings.log_file:
+        handlers.append(RotatingFileHandler(
+            settings.log_file, maxBytes=settings.log_max_bytes, backupCount=settings.log_backup_count
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = NonBlockingQueueHandler(queue.Queue(settings.log_queue_size))
+    queue_handler.addFilter(SamplingFilter(settings.log_sample_rates))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level.upper())
+
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush whatever is still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
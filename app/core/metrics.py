@@ -0,0 +1,178 @@
+import time
+from contextvars import ContextVar
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from starlette.routing import Match
+from app.core.pool import pool_status
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests served", ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, body included", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being served right now", ["method", "route"]
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Database statements issued per request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent in database statements per request", ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Duration of single database statements",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+MAINTENANCE_ROWS = Counter(
+    "maintenance_job_rows_total", "Rows deleted or rolled up by background maintenance jobs", ["job"]
+)
+MAINTENANCE_DURATION = Histogram(
+    "maintenance_job_duration_seconds", "Time taken by one run of a maintenance job", ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+
+# database work of the request being served, when there is one
+_request_db = ContextVar("request_db", default=None)
+
+
+class RequestDB:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    QUERY_DURATION.observe(elapsed)
+    current = _request_db.get()
+    if current is not None:
+        current.queries += 1
+        current.seconds += elapsed
+
+
+def instrument_engine(engine):
+    """Time every statement on a (sync) engine and charge it to the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class PoolCollector:
+    """Connection pool occupancy and wait statistics, read at scrape time."""
+
+    def __init__(self, get_engine):
+        self.get_engine = get_engine
+
+    def collect(self):
+        status = pool_status(self.get_engine().pool)
+        for key in ("size", "checked_in", "checked_out", "overflow", "waiting"):
+            if key in status:
+                gauge = GaugeMetricFamily(f"db_pool_{key}", f"Connection pool {key.replace('_', ' ')}")
+                gauge.add_metric([], status[key])
+                yield gauge
+        for key in ("checkouts", "timeouts"):
+            if key in status:
+                counter = CounterMetricFamily(f"db_pool_{key}", f"Connection pool {key} since start")
+                counter.add_metric([], status[key])
+                yield counter
+        if "max_wait_ms" in status:
+            gauge = GaugeMetricFamily("db_pool_max_wait_seconds", "Longest wait for a pooled connection")
+            gauge.add_metric([], status["max_wait_ms"] / 1000)
+            yield gauge
+
+
+def register_pool_collector(get_engine):
+    REGISTRY.register(PoolCollector(get_engine))
+
+
+def route_template(routes, method: str, path: str) -> str:
+    """The path pattern (``/products/{product_id}``) that serves a request."""
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    # unmatched paths share one label so scanners can't explode the series count
+    return partial or "unmatched"
+
+
+class PrometheusMiddleware:
+    """Request count, latency and in-flight gauges per route template and status class."""
+
+    def __init__(self, app, cache_size: int = 4096):
+        self.app = app
+        self.cache_size = cache_size
+        self._series_cache = {}
+
+    def _series(self, scope):
+        """Route template and the labelled children for a method and path, cached."""
+        key = (scope["method"], scope["path"])
+        series = self._series_cache.get(key)
+        if series is None:
+            method = key[0]
+            router = getattr(scope.get("app"), "router", None)
+            route = route_template(router.routes if router else (), *key)
+            series = (
+                route,
+                IN_PROGRESS.labels(method, route),
+                LATENCY.labels(method, route),
+                REQUEST_QUERIES.labels(route),
+                REQUEST_DB_TIME.labels(route),
+            )
+            if len(self._series_cache) >= self.cache_size:
+                self._series_cache.clear()
+            self._series_cache[key] = series
+        return series
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route, in_progress, latency, queries, db_time = self._series(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db = RequestDB()
+        token = _request_db.set(db)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            _request_db.reset(token)
+            REQUESTS.labels(scope["method"], route, f"{status_code // 100}xx").inc()
+            latency.observe(elapsed)
+            queries.observe(db.queries)
+            db_time.observe(db.seconds)
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,37 @@
+import base64
+import json
+from fastapi import HTTPException
+
+
+def encode_cursor(values: list) -> str:
+    """Opaque, URL-safe token holding the sort key of the last row on a page."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+NUMBER = (int, float)
+SCALAR = (str, int, float)
+
+
+def decode_cursor(token: str, *types) -> list:
+    """The values of a cursor, each checked against its type in ``types``; 400 otherwise.
+
+    Cursors come from the client, so a value of the wrong type must not reach
+    the row comparison the query is built from.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    for value, expected in zip(values, types):
+        check_cursor_value(value, expected)
+    return values
+
+
+def check_cursor_value(value, expected):
+    # JSON true/false would pass as int
+    if isinstance(value, bool) or not isinstance(value, expected):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,93 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """Running totals for connection checkouts from one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def begin_wait(self):
+        with self._lock:
+            self.waiting += 1
+
+    def end_wait(self, seconds: float, outcome: str = "ok"):
+        with self._lock:
+            self.waiting -= 1
+            if outcome == "timeout":
+                self.timeouts += 1
+            if outcome != "ok":
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = self.wait_seconds_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(avg * 1000, 3),
+                "max_wait_ms": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times how long callers wait to get a connection out of the pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        outcome = "error"
+        self.stats.begin_wait()
+        try:
+            connection = super().connect()
+            outcome = "ok"
+            return connection
+        except exc.TimeoutError:
+            outcome = "timeout"
+            raise
+        finally:
+            self.stats.end_wait(time.perf_counter() - started, outcome)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool) -> dict:
+    """Occupancy of a pool, plus wait statistics when the pool is instrumented."""
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,171 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from sqlalchemy import event
+from app.core.config import settings
+from app.core.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-db-profile"
+
+# statements of the request being profiled, when there is one
+_profile = ContextVar("sql_profile", default=None)
+# open query_budget blocks; they see statements from every request
+_budgets = []
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """SQL with literals, bind markers and IN/VALUES lists folded, for grouping."""
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    sql = _VALUES.sub(r"\1", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class QueryProfile:
+    """Statements seen in one request (or one ``query_budget`` block), grouped by normalized SQL."""
+
+    def __init__(self, label: str = "-"):
+        self.label = label
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}  # normalized SQL -> [count, seconds]
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.seconds += elapsed
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def repeated(self, threshold: int):
+        """Statements issued more than ``threshold`` times, most repeated first."""
+        found = [(sql, count, seconds) for sql, (count, seconds) in self.statements.items() if count > threshold]
+        return sorted(found, key=lambda item: item[1], reverse=True)
+
+    def summary(self) -> str:
+        return f"queries={self.count}; time_ms={self.seconds * 1000:.2f}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profiler_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._profiler_started
+    profile = _profile.get()
+    if profile is None and not _budgets:
+        return
+    normalized = normalize_sql(statement)
+    if profile is not None:
+        profile.record(normalized, elapsed)
+    for budget in _budgets:
+        budget.record(normalized, elapsed)
+    if elapsed * 1000 >= settings.sql_slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s params=%.500r",
+            elapsed * 1000, profile.label if profile else "-", _SPACE.sub(" ", statement), parameters,
+        )
+
+
+def profile_engine(engine):
+    """Feed every statement on a (sync) engine to the active profiles."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def unprofile_engine(engine):
+    event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int, engine=None):
+    """Fail when the block issues more than ``max_queries`` statements.
+
+    Meant for tests, e.g. ``with query_budget(3): client.get("/cart/")``.
+    Statements are counted on ``engine`` (the engine requests use, by
+    default) whether or not the profiler middleware is enabled.
+    """
+    if engine is None:
+        from app.core.database import active_engine
+        engine = active_engine()
+    hooked = not event.contains(engine, "after_cursor_execute", _after_cursor_execute)
+    if hooked:
+        profile_engine(engine)
+    budget = QueryProfile(f"budget of {max_queries}")
+    _budgets.append(budget)
+    try:
+        yield budget
+    finally:
+        _budgets.remove(budget)
+        if hooked:
+            unprofile_engine(engine)
+    if budget.count > max_queries:
+        breakdown = "\n".join(
+            f"  {count}x {sql}" for sql, (count, _) in
+            sorted(budget.statements.items(), key=lambda item: item[1][0], reverse=True)
+        )
+        raise QueryBudgetExceeded(f"{budget.count} queries issued, budget is {max_queries}:\n{breakdown}")
+
+
+class SQLProfilerMiddleware:
+    """Groups each request's statements, warns about probable N+1 patterns
+    and reports the query count and DB time in an ``X-DB-Profile`` header.
+
+    The header is written when the response starts, so statements issued
+    while a streamed body is produced are logged but not counted in it.
+    """
+
+    def __init__(self, app, nplus1_threshold: int = None):
+        self.app = app
+        self.nplus1_threshold = nplus1_threshold or settings.sql_nplus1_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        router = getattr(scope.get("app"), "router", None)
+        route = route_template(router.routes if router else (), scope["method"], scope["path"])
+        profile = QueryProfile(f"{scope['method']} {route}")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_HEADER, profile.summary().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            for sql, count, seconds in profile.repeated(self.nplus1_threshold):
+                logger.warning(
+                    "Probable N+1 on %s: %s runs (%.1f ms) of %s",
+                    profile.label, count, seconds * 1000, sql,
+                )
+            logger.debug("SQL profile for %s: %s", profile.label, profile.summary())
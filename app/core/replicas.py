@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.broadcast import broadcaster
+from app.core.config import settings
+from app.core.database import (
+    ThreadedSession, apply_session_timeouts, async_database_url, async_engine, engine, engine_options, session_scope,
+)
+from app.core.metrics import instrument_engine
+from app.core.profiler import profile_engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "replica_writes"
+FLUSH_DELAY = 0.05  # seconds of writes announced together in one message
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RoutingSession(Session):
+    """Sends reads to the session's replica and everything else to the primary.
+
+    The replica comes from ``info["replica"]``. Flushes, DML and
+    SELECT ... FOR UPDATE go to the primary, and once one has, the rest of
+    the session stays there so it reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is not None and not self.info.get("pinned"):
+            if not self._flushing and not _is_write(clause):
+                return replica
+            self.info["pinned"] = True
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def _is_write(clause) -> bool:
+    if clause is None:
+        return False
+    return bool(getattr(clause, "is_dml", False)) or getattr(clause, "_for_update_arg", None) is not None
+
+
+class ReplicaRouter:
+    """Round-robin over the read replicas, skipping any that recently failed.
+
+    Users who wrote in the last ``replica_read_your_writes_seconds`` read
+    from the primary, so replication lag never hides their own cart or
+    order. Writes are announced on the broadcaster, which keeps every
+    worker's view in step when ``cache_broadcast`` is "postgres". A topic
+    can be held on the primary the same way, e.g. the catalog after an
+    invalidation, so a cache is not refilled from a replica that has not
+    seen the change yet.
+    """
+
+    def __init__(self, engines: list):
+        self.engines = engines
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = {}  # engine index -> monotonic time it may be tried again
+        self._writers = {}  # user id -> monotonic time their reads may leave the primary
+        self._everyone_until = 0.0
+        self._held = {}  # topic -> monotonic time its reads may leave the primary
+        self._pending = set()  # writers not announced to the other workers yet
+        self._flush_task = None
+
+    def pick(self, user_id: Optional[int] = None, topic: Optional[str] = None):
+        """A healthy replica engine for this read, or None to use the primary."""
+        now = time.monotonic()
+        if now < self._everyone_until or (user_id is not None and self._writers.get(user_id, 0) > now):
+            return None
+        if topic is not None and self._held.get(topic, 0) > now:
+            return None
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = self._next
+                self._next = (self._next + 1) % len(self.engines)
+                if self._down_until.get(index, 0) <= now:
+                    return self.engines[index]
+        return None
+
+    def mark_down(self, replica):
+        index = self.engines.index(replica)
+        with self._lock:
+            self._down_until[index] = time.monotonic() + settings.replica_retry_seconds
+        logger.warning("Read replica %s unavailable; using the primary for %ss", index, settings.replica_retry_seconds)
+
+    def record_writes(self, message):
+        until = time.monotonic() + settings.replica_read_your_writes_seconds
+        # None means notifications may have been missed: keep everyone on the primary for a while
+        if message is None:
+            self._everyone_until = until
+            return
+        with self._lock:
+            for user_id in message.split(","):
+                self._writers[int(user_id)] = until
+            if len(self._writers) > 10000:
+                now = time.monotonic()
+                self._writers = {uid: t for uid, t in self._writers.items() if t > now}
+
+    def hold(self, topic: str):
+        self._held[topic] = time.monotonic() + settings.replica_read_your_writes_seconds
+
+    def note_write(self, user_id: int):
+        """Pin ``user_id`` here at once and announce it to the other workers shortly after.
+
+        Writes landing within ``FLUSH_DELAY`` go out as one message, so a busy
+        worker does not publish once per request.
+        """
+        self.record_writes(str(user_id))
+        self._pending.add(user_id)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        try:
+            await asyncio.sleep(FLUSH_DELAY)
+        finally:
+            self._flush_task = None
+            writers, self._pending = self._pending, set()
+            if writers:
+                await broadcaster.publish(CHANNEL, ",".join(str(user_id) for user_id in writers))
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        for replica in self.engines:
+            result = replica.dispose()
+            if asyncio.iscoroutine(result):
+                await result
+
+
+def _create_replica_engine(url: str):
+    if settings.async_db:
+        replica = create_async_engine(async_database_url(url), **engine_options(url, is_async=True))
+        sync_engine = replica.sync_engine
+    else:
+        replica = sync_engine = create_engine(url, **engine_options(url))
+    apply_session_timeouts(sync_engine)
+    if settings.metrics_enabled:
+        instrument_engine(sync_engine)
+    if settings.sql_profiler:
+        profile_engine(sync_engine)
+    return replica
+
+
+replica_engines = [_create_replica_engine(url) for url in settings.database_replica_urls]
+replicas = ReplicaRouter(replica_engines) if replica_engines else None
+if replicas is not None:
+    broadcaster.subscribe(CHANNEL, replicas.record_writes)
+    logger.info("Routing reads across %s replica(s): %s", len(replica_engines), ", ".join(
+        make_url(url).render_as_string(hide_password=True) for url in settings.database_replica_urls))
+
+AsyncReadSessionLocal = async_sessionmaker(
+    async_engine, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False,
+)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+
+class ReplicaWriteMiddleware:
+    """Keeps users reading from the primary after a write of theirs succeeded.
+
+    ``get_current_user`` leaves the user id in the request state for unsafe
+    methods; the write is recorded when the handler has returned (and so
+    committed) a non-error response, just before that response goes out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or replicas is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                user_id = state.get("writer_id")
+                if user_id is not None:
+                    replicas.note_write(user_id)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+async def close_replicas():
+    if replicas is not None:
+        await replicas.close()
+
+
+def hold_primary(topic: str):
+    """Read ``topic`` from the primary on this worker until replicas have caught up with a change to it."""
+    if replicas is not None:
+        replicas.hold(topic)
+
+
+@asynccontextmanager
+async def read_session_scope(user_id: Optional[int] = None, topic: Optional[str] = None):
+    """Like ``session_scope`` but reads from a replica when one is configured and healthy.
+
+    The replica connection is opened up front, so an unreachable replica is
+    marked down and the request falls back to the primary before any query
+    runs.
+    """
+    replica = replicas.pick(user_id, topic) if replicas is not None else None
+    if replica is None:
+        async with session_scope() as db:
+            yield db
+        return
+
+    if settings.async_db:
+        db = AsyncReadSessionLocal(info={"replica": replica.sync_engine})
+    else:
+        db = ThreadedSession(ReadSessionLocal(expire_on_commit=False, info={"replica": replica}))
+    try:
+        await db.connection()
+    except (DBAPIError, OSError, asyncio.TimeoutError):
+        replicas.mark_down(replica)
+        await db.close()
+        async with session_scope() as db:
+            yield db
+        return
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_read_db():
+    async with read_session_scope() as db:
+        yield db
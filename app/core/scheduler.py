@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine, session_scope
+from app.core.metrics import MAINTENANCE_DURATION, MAINTENANCE_ROWS
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 0x6D61696E74  # pg_advisory_lock key shared by every worker of this app
+
+
+class LeaderLock:
+    """A PostgreSQL session-level advisory lock held on a dedicated connection.
+
+    Whichever worker takes the lock runs the jobs; the others keep trying on
+    every tick. If the leader dies its connection closes, the server drops
+    the lock and another worker takes over. On other databases every worker
+    is its own leader, which is fine for a single process.
+    """
+
+    def __init__(self, key: int = LOCK_KEY):
+        self.key = key
+        self._connection = None
+
+    def acquire(self) -> bool:
+        """True while this worker holds the lock; blocking, run it in the thread pool."""
+        if engine.dialect.name != "postgresql":
+            return True
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()  # an idle-in-transaction timeout would drop the lock
+                return True
+            except Exception:
+                logger.warning("Lost the maintenance leader connection; the lock went with it")
+                self._discard()
+        connection = engine.connect()
+        try:
+            acquired = connection.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+            connection.commit()  # leave no transaction open while holding the lock
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        logger.info("This worker is now the maintenance leader")
+        return True
+
+    @property
+    def held(self) -> bool:
+        return self._connection is not None or engine.dialect.name != "postgresql"
+
+    def release(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._connection.commit()
+        except Exception:
+            logger.exception("Could not release the maintenance lock; closing its connection drops it")
+        self._discard()
+
+    def _discard(self):
+        try:
+            self._connection.invalidate()  # never hand a lock-holding connection back to the pool
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+
+class Scheduler:
+    """Runs registered maintenance jobs on one worker, each at its own interval.
+
+    A job is ``async fn(db, limit) -> int`` handling (deleting, rolling up)
+    at most ``limit`` rows and returning how many it did. It is called in
+    its own transaction until a batch comes back short, so no statement
+    holds locks on more than ``maintenance_batch_size`` rows.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.intervals = {}
+        self.last_runs = {}
+        self.lock = LeaderLock()
+        self._next_run = {}
+        self._task = None
+
+    def register(self, name: str, job, interval: float = None):
+        """Run ``job`` every ``interval`` seconds (default ``maintenance_interval``)."""
+        self.jobs[name] = job
+        self.intervals[name] = interval or settings.maintenance_interval
+
+    async def start(self):
+        if settings.maintenance_enabled and self.jobs:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_in_threadpool(self.lock.release)
+
+    async def _run(self):
+        tick = min(self.intervals.values())
+        while True:
+            try:
+                if await run_in_threadpool(self.lock.acquire):
+                    now = time.monotonic()
+                    due = [name for name in self.jobs if self._next_run.get(name, 0) <= now]
+                    for name in due:
+                        self._next_run[name] = now + self.intervals[name]
+                    await self.run_all(due)
+            except Exception:
+                logger.exception("Maintenance run failed")
+            await asyncio.sleep(tick)
+
+    async def run_all(self, names=None) -> dict:
+        handled = {}
+        for name in names if names is not None else list(self.jobs):
+            try:
+                handled[name] = await self.run_job(name)
+            except Exception:
+                logger.exception("Maintenance job %s failed", name)
+        return handled
+
+    async def run_job(self, name: str, limit: int = None) -> int:
+        job, limit = self.jobs[name], limit or settings.maintenance_batch_size
+        started = time.perf_counter()
+        handled = 0
+        try:
+            while True:
+                async with session_scope() as db:
+                    count = await job(db, limit)
+                    await db.commit()
+                handled += count
+                if count < limit:
+                    break
+        finally:
+            elapsed = time.perf_counter() - started
+            MAINTENANCE_ROWS.labels(name).inc(handled)
+            MAINTENANCE_DURATION.labels(name).observe(elapsed)
+            self.last_runs[name] = {
+                "finished_at": datetime.utcnow().isoformat(),
+                "rows": handled,
+                "seconds": round(elapsed, 3),
+            }
+        logger.info("Maintenance job %s handled %s rows in %.2fs", name, handled, elapsed)
+        return handled
+
+    def status(self) -> dict:
+        return {
+            "enabled": settings.maintenance_enabled,
+            "leader": self.lock.held,
+            "jobs": {name: self.last_runs.get(name) for name in self.jobs},
+        }
+
+
+scheduler = Scheduler()
@@ -0,0 +1,42 @@
+from functools import lru_cache
+import orjson
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def adapter(schema) -> TypeAdapter:
+    """One TypeAdapter per response type; building one compiles its validator and serializer."""
+    return TypeAdapter(schema)
+
+
+def columns_for(table, schema) -> tuple:
+    """The table's columns named like the schema's fields, in field order, for projection queries."""
+    return tuple(table.c[name] for name in schema.model_fields)
+
+
+def dump_models(schema, data, from_attributes: bool = True) -> bytes:
+    """Validate ``data`` against ``schema`` once and encode it, both in pydantic-core."""
+    type_adapter = adapter(schema)
+    return type_adapter.dump_json(type_adapter.validate_python(data, from_attributes=from_attributes))
+
+
+def dump_row(row) -> bytes:
+    return orjson.dumps(row._asdict())
+
+
+def dump_rows(rows) -> bytes:
+    """A JSON array of result rows keyed by column name, with no validation.
+
+    Only for trusted SQL: projections built with ``columns_for`` whose
+    column types already match the response schema.
+    """
+    if not rows:
+        return b"[]"
+    keys = rows[0]._fields  # shared by every row; ~3x cheaper than row._asdict()
+    return orjson.dumps([dict(zip(keys, row)) for row in rows])
+
+
+def json_response(body: bytes, headers: dict = None, status_code: int = 200) -> Response:
+    """Send pre-encoded JSON; FastAPI skips ``response_model`` validation for a Response."""
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
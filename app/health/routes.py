@@ -0,0 +1,34 @@
+import logging
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, active_engine
+from app.core.pool import pool_status
+from app.core.scheduler import scheduler
+from app.products.cache import cache_stats
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+logger = logging.getLogger(__name__)
+
+
+@router.get("/ready")
+async def readiness(db: AsyncSession = Depends(get_db)):
+    pool = pool_status(active_engine().pool)
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.error("Readiness check failed: %s: %s", e.__class__.__name__, e)
+        return JSONResponse(status_code=503, content={"status": "unavailable", "pool": pool})
+    return {"status": "ready", "pool": pool}
+
+
+@router.get("/cache")
+async def cache_metrics():
+    return cache_stats()
+
+
+@router.get("/maintenance")
+async def maintenance_status():
+    return scheduler.status()
@@ -0,0 +1,108 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import delete, select, tuple_, update
+from app.core.config import settings
+from app.core.database import upsert
+from app.core.scheduler import scheduler
+from app.core.serialization import json_response
+from app.idempotency.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+async def fingerprint(request: Request) -> str:
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+async def claim_key(db, user_id: int, request: Request) -> Optional[Response]:
+    """Claim the request's Idempotency-Key in the caller's transaction.
+
+    Returns None when the request should run (no key, or a new key), or the
+    stored response when the key was already used for the same request.
+    The claim is an INSERT ... ON CONFLICT DO NOTHING, so a duplicate that
+    arrives while the first request is still in flight waits on its row
+    lock and replays the stored response once the first commits. If the
+    first rolls back, the claim and any partial work disappear together and
+    the duplicate runs instead.
+    """
+    key = request.headers.get(HEADER)
+    if key is None:
+        return None
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+
+    now = datetime.utcnow()
+    request_fingerprint = await fingerprint(request)
+    # an expired key may be used again
+    await db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = (await db.execute(
+        upsert(db, IdempotencyKey.__table__)
+        .values(
+            user_id=user_id,
+            key=key,
+            fingerprint=request_fingerprint,
+            created_at=now,
+            expires_at=now + timedelta(hours=settings.idempotency_ttl_hours),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        .returning(IdempotencyKey.key)
+    )).first()
+    if claimed is not None:
+        return None
+
+    stored = (await db.execute(
+        select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    )).first()
+    if stored.fingerprint != request_fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{HEADER} was already used for a different request",
+        )
+    if stored.status_code is None:
+        # only possible if a claim was committed without its response
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A request with this key is still in progress")
+    logger.info("Replaying stored response for user %s, key %s", user_id, key)
+    return json_response(stored.body, {REPLAYED_HEADER: "true"}, stored.status_code)
+
+
+async def remember_response(db, user_id: int, request: Request, body: bytes, status_code: int = 200) -> Response:
+    """The JSON response for ``body``, stored under the request's key (if any) before the caller commits."""
+    key = request.headers.get(HEADER)
+    if key is not None:
+        await db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(status_code=status_code, body=body)
+            .execution_options(synchronize_session=False)
+        )
+    return json_response(body, status_code=status_code)
+
+
+async def purge_expired_keys(db, limit: int) -> int:
+    """Delete up to ``limit`` keys whose replay window has passed."""
+    expired = select(IdempotencyKey.user_id, IdempotencyKey.key).where(
+        IdempotencyKey.expires_at <= datetime.utcnow()
+    ).limit(limit)
+    result = await db.execute(
+        delete(IdempotencyKey)
+        .where(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(expired))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+scheduler.register("idempotency_keys", purge_expired_keys)
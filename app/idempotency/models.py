@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey, Index
+from app.core.database import Base
+import datetime
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of method, path and body
+    status_code = Column(Integer, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    # purge of expired keys
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
@@ -0,0 +1,94 @@
+import logging
+import smtplib
+from email.message import EmailMessage
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPMailer:
+    """Sends messages over one long-lived, authenticated SMTP connection.
+
+    STARTTLS and login happen once per connection rather than once per
+    message. The connection is checked with NOOP at the start of each batch
+    and reopened when the server has dropped it. Not thread-safe: the outbox
+    worker sends one batch at a time.
+    """
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 starttls: bool = True, login: bool = True, timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.login = login
+        self.timeout = timeout
+        self._smtp = None
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.login:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        logger.info("Opened SMTP connection to %s:%s", self.host, self.port)
+        return smtp
+
+    def _connection(self):
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        self._smtp = self._connect()
+        return self._smtp
+
+    def send_batch(self, messages: list) -> list:
+        """Send each message, returning ``None`` or an error string per message."""
+        results = []
+        for message in messages:
+            try:
+                self._connection().send_message(message)
+                results.append(None)
+            except (smtplib.SMTPException, OSError) as e:
+                results.append(f"{e.__class__.__name__}: {e}")
+                if not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+                    # the connection itself is suspect; reopen it for the next message
+                    self.close()
+        return results
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+
+def build_message(recipient: str, subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = settings.email_from
+    message["To"] = recipient
+    message.set_content(body)
+    return message
+
+
+def create_mailer() -> SMTPMailer:
+    return SMTPMailer(
+        settings.email_server,
+        settings.email_port,
+        settings.email_from,
+        settings.email_password,
+        starttls=settings.email_starttls,
+        login=settings.email_login,
+    )
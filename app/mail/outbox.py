@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import session_scope
+from app.core.scheduler import scheduler
+from app.mail.mailer import build_message, create_mailer
+from app.mail.models import EmailOutbox, OutboxStatus
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(db, recipient: str, subject: str, body: str) -> EmailOutbox:
+    """Queue a message in the caller's transaction; it is sent only if that commits."""
+    message = EmailOutbox(recipient=recipient, subject=subject, body=body)
+    db.add(message)
+    return message
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at ``mail_retry_max`` seconds."""
+    delay = min(settings.mail_retry_max, settings.mail_retry_base * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxWorker:
+    """Delivers queued email in the background of every app process.
+
+    Due messages are claimed with ``FOR UPDATE SKIP LOCKED`` and a lease so
+    several workers on PostgreSQL never send the same message twice. A failed message
+    is retried with backoff until ``mail_max_attempts``, then marked failed.
+    """
+
+    def __init__(self, mailer=None):
+        self.mailer = mailer or create_mailer()
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def wake(self):
+        """Look at the outbox now instead of at the next poll."""
+        self._wake.set()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_in_threadpool(self.mailer.close)
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                handled = await self.deliver_batch()
+            except Exception:
+                logger.exception("Outbox delivery failed")
+                handled = 0
+            if handled >= settings.mail_batch_size:
+                continue  # more are probably waiting
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.mail_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def deliver_batch(self) -> int:
+        """Send one batch of due messages and record the outcome of each.
+
+        The batch is claimed in one short transaction and the outcomes are
+        written in another, so no connection or row lock is held while the
+        mail server is slow.
+        """
+        batch = await self.claim_batch()
+        if not batch:
+            return 0
+
+        messages = [build_message(item.recipient, item.subject, item.body) for item in batch]
+        try:
+            results = await run_in_threadpool(self.mailer.send_batch, messages)
+        except Exception as e:
+            # could not even connect: every message in the batch failed
+            results = [f"{e.__class__.__name__}: {e}"] * len(batch)
+
+        sent = await self.record_results(batch, results)
+        logger.info("Outbox batch: %s sent, %s failed", sent, len(batch) - sent)
+        return len(batch)
+
+    async def claim_batch(self) -> list:
+        """Lease due messages to this worker for ``mail_lease_seconds`` and count the attempt.
+
+        Other workers skip the locked rows while the claim commits and the
+        leased ones afterwards; if this worker dies mid-send, the lease runs
+        out and the messages are picked up again.
+        """
+        async with session_scope() as db:
+            now = datetime.utcnow()
+            batch = (await db.execute(
+                select(EmailOutbox)
+                .where(EmailOutbox.status == OutboxStatus.pending, EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+                .limit(settings.mail_batch_size)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+            for item in batch:
+                item.attempts += 1
+                item.next_attempt_at = now + timedelta(seconds=settings.mail_lease_seconds)
+            await db.commit()
+        return batch
+
+    async def record_results(self, batch: list, results: list) -> int:
+        """Mark each message sent, rescheduled or failed; returns how many were sent."""
+        outcomes = dict(zip((item.id for item in batch), results))
+        sent = 0
+        async with session_scope() as db:
+            rows = (await db.execute(
+                select(EmailOutbox).where(EmailOutbox.id.in_(outcomes)).with_for_update()
+            )).scalars().all()
+            now = datetime.utcnow()
+            for item in rows:
+                error = outcomes[item.id]
+                if error is None:
+                    item.status = OutboxStatus.sent
+                    item.sent_at = now
+                    item.last_error = None
+                    sent += 1
+                elif item.attempts >= settings.mail_max_attempts:
+                    item.status = OutboxStatus.failed
+                    item.last_error = error[:500]
+                    logger.error("Giving up on email %s to %s after %s attempts: %s", item.id, item.recipient, item.attempts, error)
+                else:
+                    item.last_error = error[:500]
+                    item.next_attempt_at = now + timedelta(seconds=retry_delay(item.attempts))
+                    logger.warning("Email %s to %s failed (attempt %s): %s", item.id, item.recipient, item.attempts, error)
+            await db.commit()
+        return sent
+
+
+async def purge_finished_email(db, limit: int) -> int:
+    """Delete up to ``limit`` sent or failed messages older than ``mail_retention_days``.
+
+    Age is counted from when a message was sent, or queued if it never was.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.mail_retention_days)
+    finished = select(EmailOutbox.id).where(
+        EmailOutbox.status.in_([OutboxStatus.sent, OutboxStatus.failed]),
+        func.coalesce(EmailOutbox.sent_at, EmailOutbox.created_at) < cutoff,
+    ).limit(limit)
+    result = await db.execute(
+        delete(EmailOutbox).where(EmailOutbox.id.in_(finished)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+scheduler.register("email_outbox", purge_finished_email)
+mail_worker = OutboxWorker()
@@ -1,18 +1,62 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from app.core.logger import configure_logging
 from app.auth.routes import router as auth_router
 from app.products.routes import router as admin_products_router
 from app.products.public_routes import public_router as public_products_router
 from app.cart.routes import router as cart_router
 from app.checkout.routes import router as checkout_router
 from app.orders.routes import router as order_router  # Assuming you have an order router
+from app.health.routes import router as health_router
+from app.analytics.routes import router as analytics_router
+from app.core.broadcast import broadcaster
+from app.core.config import settings
+from app.core.database import async_engine, engine
+from app.core.metrics import PrometheusMiddleware, router as metrics_router
+from app.core.profiler import SQLProfilerMiddleware
+from app.core.replicas import ReplicaWriteMiddleware, close_replicas, replicas
+from app.core.scheduler import scheduler
+from app.mail.outbox import mail_worker
 
-app = FastAPI()
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await broadcaster.start()
+    await mail_worker.start()
+    await scheduler.start()
+    yield
+    await scheduler.stop()
+    await mail_worker.stop()
+    await close_replicas()
+    await broadcaster.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 app.include_router(auth_router)
 app.include_router(admin_products_router)  
 app.include_router(public_products_router)
 app.include_router(cart_router) 
 app.include_router(checkout_router)
 app.include_router(order_router)  # Assuming you have an order router
+app.include_router(health_router)
+app.include_router(analytics_router)
+
+if settings.metrics_enabled:
+    app.add_middleware(PrometheusMiddleware)
+    app.include_router(metrics_router)
+
+if settings.sql_profiler:
+    app.add_middleware(SQLProfilerMiddleware)
+
+if replicas is not None:
+    app.add_middleware(ReplicaWriteMiddleware)
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index, String
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -23,6 +23,11 @@ class Order(Base):
     items = relationship("OrderItem", back_populates="order", cascade="all, delete")
     status = Column(Enum(OrderStatus), default=OrderStatus.pending)
 
+    # order history: one user's orders, newest first, keyset-paginated
+    __table_args__ = (
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
 
@@ -31,6 +36,11 @@ class OrderItem(Base):
     product_id = Column(Integer, ForeignKey("products.id"))
     quantity = Column(Integer)
     price_at_purchase = Column(Float)  # price at time of ordering
+    category = Column(String, nullable=True)  # product category at time of ordering, for the sales rollups
 
     order = relationship("Order", back_populates="items")
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Product")
+
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+    )
@@ -1,30 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.auth.dependencies import require_user
+import logging
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.serialization import columns_for, dump_models, dump_rows, json_response
+from app.auth.dependencies import get_user_read_db, require_user
 from app.orders import models, schemas
-from app.core.logger import logger
+from typing import List, Optional, Union
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
-@router.get("/", response_model=list[schemas.OrderSummary])
-def get_order_history(user=Depends(require_user), db: Session = Depends(get_db)):
-    logger.info(f"User {user.id} requested order history")
-    orders = db.query(models.Order).filter(models.Order.user_id == user.id).all()
-    logger.info(f"Fetched {len(orders)} orders for user {user.id}")
-    return orders
+SUMMARY_COLUMNS = columns_for(models.Order.__table__, schemas.OrderSummary)
+
+logger = logging.getLogger(__name__)
+
+@router.get("/", response_model=List[Union[schemas.OrderOut, schemas.OrderSummary]])
+async def get_order_history(
+    limit: int = Query(default=20, ge=1, le=100),
+    after: Optional[str] = Query(default=None, description="Cursor from X-Next-Cursor"),
+    include_items: bool = False,
+    user=Depends(require_user),
+    db: AsyncSession = Depends(get_user_read_db)
+):
+    logger.info("User %s requested order history", user.id)
+    orders = await load_order_page(db, user.id, limit, after, include_items)
+    headers = {}
+    if len(orders) == limit:
+        last = orders[-1]
+        headers["X-Next-Cursor"] = encode_cursor([last.created_at.isoformat(), last.id])
+    logger.info("Fetched %s orders for user %s", len(orders), user.id)
+    body = dump_models(List[schemas.OrderOut], orders) if include_items else dump_rows(orders)
+    return json_response(body, headers)
+
+
+async def load_order_page(db, user_id: int, limit: int, after: Optional[str], include_items: bool):
+    """One page of a user's orders, newest first: one query, plus one for items if asked.
+
+    Without items the rows are an ``OrderSummary`` column projection, not ORM objects.
+    """
+    if include_items:
+        query = select(models.Order).options(selectinload(models.Order.items))
+    else:
+        query = select(*SUMMARY_COLUMNS)
+    query = (
+        query.filter(models.Order.user_id == user_id)
+        .order_by(models.Order.created_at.desc(), models.Order.id.desc())
+    )
+    if after:
+        created_at, last_id = decode_cursor(after, str, int)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(tuple_(models.Order.created_at, models.Order.id) < tuple_(created_at, last_id))
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all() if include_items else result.all()
 
 @router.get("/{order_id}", response_model=schemas.OrderOut)
-def get_order_by_id(order_id: int, user=Depends(require_user), db: Session = Depends(get_db)):
-    logger.info(f"User {user.id} requested order ID {order_id}")
-    order = db.query(models.Order).filter(
-        models.Order.id == order_id,
-        models.Order.user_id == user.id
-    ).first()
+async def get_order_by_id(order_id: int, user=Depends(require_user), db: AsyncSession = Depends(get_user_read_db)):
+    logger.info("User %s requested order ID %s", user.id, order_id)
+    order = (await db.execute(
+        select(models.Order)
+        .options(selectinload(models.Order.items))
+        .filter(models.Order.id == order_id, models.Order.user_id == user.id)
+    )).scalars().first()
 
     if not order:
-        logger.warning(f"Order ID {order_id} not found for user {user.id}")
+        logger.warning("Order ID %s not found for user %s", order_id, user.id)
         raise HTTPException(status_code=404, detail="Order not found")
 
-    logger.info(f"Order ID {order_id} details returned for user {user.id}")
+    logger.info("Order ID %s details returned for user %s", order_id, user.id)
     return order
@@ -0,0 +1,216 @@
+import csv
+import io
+import json
+import logging
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import stream_rows, upsert
+from app.products.models import Product
+from app.products.schemas import ProductCreate
+
+try:
+    from asyncpg import InterfaceError as CopyInputError, PostgresError as CopyError
+except ImportError:  # only the asyncpg COPY path raises these
+    CopyInputError = CopyError = SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# what a chunk or row upsert can raise for data the database or driver refuses:
+# SQLAlchemy errors, raw asyncpg errors from the COPY path, and Python
+# values the driver cannot convert (e.g. an int too large for SQLite)
+UPSERT_ERRORS = (SQLAlchemyError, CopyError, CopyInputError, OverflowError)
+
+COLUMNS = ["sku", "name", "description", "price", "stock", "category", "image_url"]
+EXPORT_COLUMNS = ["id"] + COLUMNS
+MAX_REPORTED_ERRORS = 1000
+
+
+async def iter_lines(chunks):
+    """Split a stream of byte chunks into decoded lines without buffering the body."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_ndjson(chunks):
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            # reported against its row by validate_row instead of aborting the import
+            yield e
+
+
+async def iter_csv(chunks):
+    header = None
+    record = ""
+    async for line in iter_lines(chunks):
+        # a quoted field may span lines: keep reading until the quotes balance
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]))
+        record = ""
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if values:
+            yield {name: (value if value != "" else None) for name, value in zip(header, values)}
+
+
+class ImportReport:
+    def __init__(self):
+        self.received = 0
+        self.upserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def reject(self, row_number: int, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "errors": errors})
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "upserted": self.upserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def validate_row(row):
+    """Returns (values, None) for a good row or (None, errors) for a bad one."""
+    if isinstance(row, ValueError):
+        return None, [f"invalid JSON: {row}"]
+    if not isinstance(row, dict):
+        return None, ["Row must be an object"]
+    try:
+        product = ProductCreate.model_validate(row)
+    except ValidationError as e:
+        return None, [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+    if not product.sku:
+        return None, ["sku: required for import"]
+    return product.model_dump(), None
+
+
+async def copy_upsert(db: AsyncSession, rows: list):
+    """COPY the chunk into a temp staging table, then upsert it in one statement."""
+    connection = await db.connection()
+    raw = (await connection.get_raw_connection()).driver_connection
+    updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS if c != "sku")
+    # becomes a savepoint if the session already has a transaction open
+    async with raw.transaction():
+        await raw.execute(
+            "CREATE TEMP TABLE products_staging (sku text, name text, description text, "
+            "price double precision, stock integer, category text, image_url text) ON COMMIT DROP"
+        )
+        await raw.copy_records_to_table(
+            "products_staging", records=[tuple(row[c] for c in COLUMNS) for row in rows], columns=COLUMNS
+        )
+        await raw.execute(
+            f"INSERT INTO products ({', '.join(COLUMNS)}) "
+            f"SELECT {', '.join(COLUMNS)} FROM products_staging "
+            f"ON CONFLICT (sku) DO UPDATE SET {updates}"
+        )
+
+
+async def insert_upsert(db, rows: list):
+    """Batched INSERT ... ON CONFLICT (sku) DO UPDATE for drivers without COPY."""
+    # parameters go to executemany so the statement compiles once and is cached,
+    # instead of compiling a fresh VALUES list for every chunk
+    statement = upsert(db, Product.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Product.sku],
+        set_={c: statement.excluded[c] for c in COLUMNS if c != "sku"},
+    )
+    await db.execute(statement, rows)
+
+
+def database_error(e: Exception) -> str:
+    return f"database: {e.__class__.__name__}: {getattr(e, 'orig', e)}"[:300]
+
+
+async def upsert_rows(db, rows: list):
+    if db.bind.dialect.name == "postgresql" and isinstance(db, AsyncSession) and db.bind.dialect.driver == "asyncpg":
+        await copy_upsert(db, rows)
+    else:
+        await insert_upsert(db, rows)
+
+
+async def upsert_chunk(db, chunk: list, report: ImportReport):
+    # the last occurrence of a sku wins; ON CONFLICT can't touch a row twice
+    by_sku = {}
+    for row_number, values in chunk:
+        previous = by_sku.get(values["sku"])
+        if previous is not None:
+            report.reject(previous[0], [f"sku: {values['sku']} appears again at row {row_number}, which replaces this row"])
+        by_sku[values["sku"]] = (row_number, values)
+
+    try:
+        await upsert_rows(db, [values for _, values in by_sku.values()])
+        await db.commit()
+        report.upserted += len(by_sku)
+        return
+    except UPSERT_ERRORS as e:
+        await db.rollback()
+        logger.warning("[admin] Import chunk of %s rows failed (%s); retrying row by row", len(by_sku), e.__class__.__name__)
+
+    # one transaction per row so only the rows the database refuses are rejected
+    for row_number, values in by_sku.values():
+        try:
+            await insert_upsert(db, [values])
+            await db.commit()
+            report.upserted += 1
+        except UPSERT_ERRORS as e:
+            await db.rollback()
+            report.reject(row_number, [database_error(e)])
+
+
+async def import_products(db, records) -> ImportReport:
+    """Validate and upsert an async stream of row dicts in chunks."""
+    report = ImportReport()
+    chunk = []
+    async for row in records:
+        report.received += 1
+        values, errors = validate_row(row)
+        if errors:
+            report.reject(report.received, errors)
+            continue
+        chunk.append((report.received, values))
+        if len(chunk) >= settings.import_chunk_size:
+            await upsert_chunk(db, chunk, report)
+            chunk = []
+    if chunk:
+        await upsert_chunk(db, chunk, report)
+    return report
+
+
+async def export_products(db, fmt: str):
+    """Stream the catalog as CSV or NDJSON straight from a server-side cursor."""
+    columns = [getattr(Product, c) for c in EXPORT_COLUMNS]
+    statement = select(*columns).order_by(Product.id)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue().encode()
+    async for rows in stream_rows(db, statement, settings.export_chunk_size):
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+        else:
+            yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows).encode()
@@ -0,0 +1,95 @@
+import hashlib
+import logging
+import orjson
+from fastapi import Request, Response
+from app.core.broadcast import broadcaster
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.replicas import hold_primary, read_session_scope
+from app.core.serialization import columns_for, dump_row, dump_rows
+from app.products.models import Product
+from app.products.schemas import ProductOut
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "catalog_invalidation"
+ALL_PRODUCTS = "*"
+TOPIC = "catalog"  # replica routing topic of the reads that fill these caches
+
+detail_cache = LRUCache("product_detail", settings.catalog_cache_size, settings.catalog_cache_ttl)
+listing_cache = LRUCache("product_listing", settings.catalog_cache_size, settings.catalog_cache_ttl)
+facet_cache = LRUCache("product_facets", settings.catalog_cache_size, settings.catalog_cache_ttl)
+
+# select(*PRODUCT_COLUMNS) rows serialize straight to ProductOut JSON
+PRODUCT_COLUMNS = columns_for(Product.__table__, ProductOut)
+
+
+class CachedBody:
+    """A serialized JSON body with its strong ETag and any extra headers."""
+
+    __slots__ = ("body", "etag", "headers")
+
+    def __init__(self, body: bytes, headers: dict = None):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.headers = headers or {}
+
+
+def product_body(row) -> CachedBody:
+    return CachedBody(dump_row(row))
+
+
+def listing_body(rows, headers: dict = None) -> CachedBody:
+    return CachedBody(dump_rows(rows), headers)
+
+
+def facets_body(facets: dict) -> CachedBody:
+    return CachedBody(orjson.dumps(facets))
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_response(request: Request, cached: CachedBody) -> Response:
+    """200 with the stored bytes, or 304 when the client already has them."""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache", **cached.headers}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def _drop(message):
+    hold_primary(TOPIC)  # refill from the primary, not a replica that may still have the old rows
+    # None means notifications may have been missed: start from scratch
+    if message is None or message == ALL_PRODUCTS:
+        detail_cache.clear()
+        listing_cache.clear()
+        facet_cache.clear()
+        return
+    for product_id in message.split(","):
+        detail_cache.delete(int(product_id))
+    listing_cache.clear()
+    facet_cache.clear()
+
+
+broadcaster.subscribe(CHANNEL, _drop)
+
+
+async def invalidate_products(*product_ids: int):
+    """Drop cached copies of the given products (or everything) on every worker."""
+    message = ",".join(str(pid) for pid in product_ids) if product_ids else ALL_PRODUCTS
+    await broadcaster.publish(CHANNEL, message)
+
+
+async def get_catalog_db():
+    """Session for reads that may fill the catalog caches."""
+    async with read_session_scope(topic=TOPIC) as db:
+        yield db
+
+
+def cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in (detail_cache, listing_cache, facet_cache)}
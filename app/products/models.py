@@ -1,13 +1,59 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, DDL, Index, event
 from app.core.database import Base
 
 class Product(Base):
     __tablename__ = "products"
 
     id = Column(Integer, primary_key=True, index=True)
+    sku = Column(String, nullable=True)  # supplier key, upsert target of bulk import
     name = Column(String, nullable=False)
     description = Column(String, nullable=False)
     price = Column(Float, nullable=False)
     stock = Column(Integer, nullable=False)
     category = Column(String, nullable=False)
-    image_url = Column(String, nullable=True)
\ No newline at end of file
+    image_url = Column(String, nullable=True)
+
+    # Keyset pagination of the public listing: (filter, sort key, id tiebreaker).
+    # Stock has no index on purpose, checkout rewrites it on every order.
+    __table_args__ = (
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_category_name_id", "category", "name", "id"),
+        Index("ix_products_category_price_id", "category", "price", "id"),
+        Index("ix_products_sku", "sku", unique=True),
+    )
+
+# Full-text search support; see app/products/search.py. The search column/table
+# is maintained by the database itself so every product write keeps it current.
+PG_SEARCH_DDL = [
+    "ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(category, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE products_fts USING fts5("
+    "name, description, category, content='products', content_rowid='id')",
+    "CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts(rowid, name, description, category) "
+    "VALUES (new.id, new.name, new.description, new.category); END",
+    "CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, category) "
+    "VALUES ('delete', old.id, old.name, old.description, old.category); END",
+    "CREATE TRIGGER products_fts_au AFTER UPDATE OF name, description, category ON products BEGIN "
+    "INSERT INTO products_fts(products_fts, rowid, name, description, category) "
+    "VALUES ('delete', old.id, old.name, old.description, old.category); "
+    "INSERT INTO products_fts(rowid, name, description, category) "
+    "VALUES (new.id, new.name, new.description, new.category); END",
+]
+
+for statement in PG_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Product.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS products_fts").execute_if(dialect="sqlite")
+)
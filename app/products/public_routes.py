@@ -1,55 +1,153 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from requests import Session
-from app.auth.dependencies import get_db
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import and_, case, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.pagination import NUMBER, SCALAR, check_cursor_value, encode_cursor, decode_cursor
+from app.core.serialization import dump_rows, json_response
 from app.products.models import Product
-from app.products.schemas import ProductOut
+from app.products.schemas import ProductFacets, ProductOut
+from app.products import search
+from app.products.cache import (
+    PRODUCT_COLUMNS, detail_cache, facet_cache, listing_cache, product_body, listing_body, facets_body, cached_response,
+    get_catalog_db,
+)
 from typing import List, Optional
 
 public_router = APIRouter(prefix="/products", tags=["Public Products"])
 
+SORT_COLUMNS = {"name": Product.name, "price": Product.price, "stock": Product.stock}
+SORT_VALUE_TYPES = {"name": str, "price": NUMBER, "stock": int}  # what a cursor may carry for each
+
+
 @public_router.get("/", response_model=List[ProductOut])
-def list_products(
+async def list_products(
+    request: Request,
     category: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     sort_by: Optional[str] = Query(default="name", pattern="^(name|price|stock)$"),
     page: int = Query(default=1, ge=1),
-    limit: int = Query(default=10, ge=1),
-    db: Session = Depends(get_db)
+    limit: int = Query(default=10, ge=1, le=100),
+    after: Optional[str] = Query(default=None, description="Cursor from X-Next-Cursor; replaces page"),
+    db: AsyncSession = Depends(get_catalog_db)
 ):
-    query = db.query(Product)
+    key = (category, min_price, max_price, sort_by, None if after else page, limit, after)
+    generation = listing_cache.generation
+    cached = listing_cache.get(key)
+    if cached is None:
+        cached = await _load_listing(db, category, min_price, max_price, sort_by, page, limit, after)
+        listing_cache.set(key, cached, generation)
+    return cached_response(request, cached)
 
-    if category:
-        query = query.filter(Product.category.ilike(f"%{category}%"))
+
+def _price_conditions(min_price, max_price) -> list:
+    conditions = []
     if min_price is not None:
-        query = query.filter(Product.price >= min_price)
+        conditions.append(Product.price >= min_price)
     if max_price is not None:
-        query = query.filter(Product.price <= max_price)
-    if sort_by == "price":
-        query = query.order_by(Product.price)
-    elif sort_by == "stock":
-        query = query.order_by(Product.stock)
-    else:
-        query = query.order_by(Product.name)
+        conditions.append(Product.price <= max_price)
+    return conditions
 
-    offset = (page - 1) * limit
-    return query.offset(offset).limit(limit).all()
 
-@public_router.get("/{product_id}", response_model=ProductOut)
-def get_product_detail(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+async def _load_listing(db, category, min_price, max_price, sort_by, page, limit, after):
+    query = select(*PRODUCT_COLUMNS)
+
+    if category:
+        query = query.filter(Product.category == category)
+    query = query.filter(*_price_conditions(min_price, max_price))
+
+    # id breaks ties so every row has a unique position for the cursor
+    sort_column = SORT_COLUMNS[sort_by]
+    query = query.order_by(sort_column, Product.id)
+
+    if after:
+        cursor_sort, value, last_id = decode_cursor(after, str, SCALAR, int)
+        if cursor_sort != sort_by:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort_by")
+        check_cursor_value(value, SORT_VALUE_TYPES[sort_by])
+        query = query.filter(tuple_(sort_column, Product.id) > tuple_(value, last_id))
+    else:
+        query = query.offset((page - 1) * limit)
+
+    products = (await db.execute(query.limit(limit))).all()
+    headers = {}
+    if len(products) == limit:
+        last = products[-1]
+        headers["X-Next-Cursor"] = encode_cursor([sort_by, getattr(last, sort_by), last.id])
+    return listing_body(products, headers)
 
 @public_router.get("/search", response_model=List[ProductOut])
-def search_products(
+async def search_products(
     keyword: str = Query(..., min_length=2),
-    db: Session = Depends(get_db)
+    page: int = Query(default=1, ge=1),
+    limit: int = Query(default=10, ge=1, le=100),
+    db: AsyncSession = Depends(get_catalog_db)
+):
+    return json_response(dump_rows(await search.search_products(db, keyword, page, limit)))
+
+@public_router.get("/facets", response_model=ProductFacets)
+async def product_facets(
+    request: Request,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    db: AsyncSession = Depends(get_catalog_db)
 ):
-    results = db.query(Product).filter(
-        (Product.name.ilike(f"%{keyword}%")) |
-        (Product.description.ilike(f"%{keyword}%")) |
-        (Product.category.ilike(f"%{keyword}%"))
-    ).all()
-    return results
\ No newline at end of file
+    """Sidebar counts for the filters ``list_products`` takes.
+
+    ``total`` matches every filter. Category counts apply the price filter
+    and price buckets the category filter, so the sidebar can offer the
+    other choices of the facet being filtered on.
+    """
+    key = (category or None, min_price, max_price)
+    generation = facet_cache.generation
+    cached = facet_cache.get(key)
+    if cached is None:
+        cached = facets_body(await _load_facets(db, *key))
+        facet_cache.set(key, cached, generation)
+    return cached_response(request, cached)
+
+
+async def _load_facets(db, category, min_price, max_price) -> dict:
+    # one grouped scan: product counts per category and price bucket, with and without the price filter
+    edges = settings.facet_price_edges
+    bucket = case(*((Product.price < edge, index) for index, edge in enumerate(edges)), else_=len(edges))
+    conditions = _price_conditions(min_price, max_price)
+    in_range = func.sum(case((and_(*conditions), 1), else_=0)) if conditions else func.count()
+    rows = (await db.execute(
+        select(Product.category, bucket.label("bucket"), func.count().label("products"), in_range.label("in_range"))
+        .group_by(Product.category, bucket)
+    )).all()
+
+    categories = defaultdict(int)
+    buckets = [0] * (len(edges) + 1)
+    total = 0
+    for row in rows:
+        categories[row.category] += row.in_range
+        if not category or row.category == category:
+            buckets[row.bucket] += row.products
+            total += row.in_range
+    bounds = [None, *edges, None]
+    return {
+        "total": total,
+        "categories": [
+            {"category": name, "count": count}
+            for name, count in sorted(categories.items(), key=lambda item: (-item[1], item[0])) if count
+        ],
+        "price": [
+            {"min": bounds[index], "max": bounds[index + 1], "count": count} for index, count in enumerate(buckets)
+        ],
+    }
+
+@public_router.get("/{product_id}", response_model=ProductOut)
+async def get_product_detail(product_id: int, request: Request, db: AsyncSession = Depends(get_catalog_db)):
+    generation = detail_cache.generation
+    cached = detail_cache.get(product_id)
+    if cached is None:
+        product = (await db.execute(select(*PRODUCT_COLUMNS).where(Product.id == product_id))).first()
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        cached = product_body(product)
+        detail_cache.set(product_id, cached, generation)
+    return cached_response(request, cached)
@@ -1,61 +1,107 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.products import models, schemas
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, session_scope
+from app.core.streaming import stream_query
+from app.products import models, schemas, bulk
 from app.auth.dependencies import require_admin
+from app.products.cache import invalidate_products
 
 router = APIRouter(prefix="/admin/products", tags=["Admin Products"])
 
 logger = logging.getLogger(__name__)
 
 @router.post("/", response_model=schemas.ProductOut)
-def create_product(product: schemas.ProductCreate, db: Session = Depends(get_db), admin=Depends(require_admin)):
+async def create_product(product: schemas.ProductCreate, db: AsyncSession = Depends(get_db), admin=Depends(require_admin)):
     new_product = models.Product(**product.dict())
     db.add(new_product)
-    db.commit()
-    db.refresh(new_product)
-    logger.info(f"[admin] Product created with ID: {new_product.id}")
-    print("REQUEST RECEIVED:", product.dict())
+    await db.commit()
+    await invalidate_products(new_product.id)
+    logger.info("[admin] Product created with ID: %s", new_product.id)
     return new_product
 
 @router.get("/", response_model=list[schemas.ProductOut])
-def list_products(db: Session = Depends(get_db), admin=Depends(require_admin)):
-    return db.query(models.Product).all()
+async def list_products(format: str = Query("json", pattern="^(json|ndjson)$"), admin=Depends(require_admin)):
+    logger.info("[admin] Streaming product list as %s", format)
+    statement = select(*models.Product.__table__.columns).order_by(models.Product.id)
+    return stream_query(statement, schemas.ProductOut, format)
+
+IMPORT_PARSERS = {
+    "text/csv": bulk.iter_csv,
+    "application/csv": bulk.iter_csv,
+    "application/x-ndjson": bulk.iter_ndjson,
+    "application/ndjson": bulk.iter_ndjson,
+    "application/jsonl": bulk.iter_ndjson,
+}
+
+@router.post("/import")
+async def import_products(request: Request, db: AsyncSession = Depends(get_db), admin=Depends(require_admin)):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parser = IMPORT_PARSERS.get(content_type)
+    if parser is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson")
+
+    report = await bulk.import_products(db, parser(request.stream()))
+    if report.upserted:
+        await invalidate_products()
+    logger.info("[admin] Import finished: %s upserted, %s failed of %s", report.upserted, report.failed, report.received)
+    return report.as_dict()
+
+@router.get("/export")
+async def export_products(format: str = Query("ndjson", pattern="^(csv|ndjson)$"), admin=Depends(require_admin)):
+    # the request-scoped session is closed before a streamed body runs, so open one here
+    async def body():
+        async with session_scope() as db:
+            async for chunk in bulk.export_products(db, format):
+                yield chunk
+
+    logger.info("[admin] Exporting catalog as %s", format)
+    return StreamingResponse(
+        body(),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
 
 @router.get("/{product_id}", response_model=schemas.ProductOut)
-def get_product(product_id: int, db: Session = Depends(get_db), admin=Depends(require_admin)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_db), admin=Depends(require_admin)):
     logger.info("[admin] Listing all products")
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    product = await db.get(models.Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
 @router.put("/{product_id}", response_model=schemas.ProductOut)
-def update_product(product_id: int, updated: schemas.ProductUpdate, db: Session = Depends(get_db), admin=Depends(require_admin)):
-    logger.info(f"[admin] Fetching product with ID: {product_id}")
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
+async def update_product(product_id: int, updated: schemas.ProductUpdate, db: AsyncSession = Depends(get_db), admin=Depends(require_admin)):
+    logger.info("[admin] Fetching product with ID: %s", product_id)
+    product = await db.get(models.Product, product_id)
     if not product:
-        logger.warning(f"[admin] Product not found with ID: {product_id}")
+        logger.warning("[admin] Product not found with ID: %s", product_id)
         raise HTTPException(status_code=404, detail="Product not found")
     
-    for key, value in updated.dict().items():
+    values = updated.dict()
+    if "sku" not in updated.model_fields_set:
+        # clients written before sku existed must not wipe the import key
+        values.pop("sku")
+    for key, value in values.items():
         setattr(product, key, value)
 
-    db.commit()
-    db.refresh(product)
-    logger.info(f"[admin] Product updated: ID {product.id}")
+    await db.commit()
+    await invalidate_products(product.id)
+    logger.info("[admin] Product updated: ID %s", product.id)
     return product
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(product_id: int, db: Session = Depends(get_db), admin=Depends(require_admin)):
-    logger.info(f"[admin] Deleting product ID: {product_id}")
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_db), admin=Depends(require_admin)):
+    logger.info("[admin] Deleting product ID: %s", product_id)
+    product = await db.get(models.Product, product_id)
     if not product:
-        logger.warning(f"[admin] Delete failed, product not found: ID {product_id}")
+        logger.warning("[admin] Delete failed, product not found: ID %s", product_id)
         raise HTTPException(status_code=404, detail="Product not found")
 
-    db.delete(product)
-    db.commit()
-    logger.info(f"[admin] Product deleted: ID {product_id}")
+    await db.delete(product)
+    await db.commit()
+    await invalidate_products(product_id)
+    logger.info("[admin] Product deleted: ID %s", product_id)
     return None
\ No newline at end of file
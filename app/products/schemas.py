@@ -1,11 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
+
+MAX_STOCK = 2**31 - 1  # products.stock is a 32-bit INTEGER
+
 
 class ProductCreate(BaseModel):
+    sku: Optional[str] = None
     name: str
     description: str
-    price: float = Field(..., gt=0, description="Price must be greater than 0")
-    stock: int = Field(..., ge=0, description="Stock must be zero or more")
+    price: float = Field(..., gt=0, allow_inf_nan=False, description="Price must be greater than 0")
+    stock: int = Field(..., ge=0, le=MAX_STOCK, description="Stock must be zero or more")
     category: str
     image_url: Optional[str] = None
 
@@ -16,20 +20,32 @@ class ProductCreate(BaseModel):
 class ProductUpdate(ProductCreate):
     pass
 
-class ProductOut(ProductCreate):
-    id: int
-
-    class Config:
-        from_attributes = True
-
 class ProductOut(BaseModel):
     id: int
+    sku: Optional[str] = None
     name: str
     description: str
     price: float
     stock: int
     category: str
-    image_url: str
+    image_url: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CategoryCount(BaseModel):
+    category: str
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None  # exclusive
+    count: int
+
+
+class ProductFacets(BaseModel):
+    total: int
+    categories: List[CategoryCount]
+    price: List[PriceBucket]
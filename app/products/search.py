@@ -0,0 +1,56 @@
+from sqlalchemy import select, func, literal_column, or_, text, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.products.models import Product
+from app.products.cache import PRODUCT_COLUMNS
+
+# Column weights for name, description, category in SQLite's bm25()
+FTS5_WEIGHTS = (10.0, 1.0, 5.0)
+
+products_fts = table("products_fts", column("rowid"))
+
+
+def fts5_query(keyword: str) -> str:
+    """Quote every term so user input can't inject FTS5 query syntax."""
+    terms = keyword.split()
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def build_search_query(dialect: str, keyword: str):
+    """Relevance-ranked product search for the given database dialect."""
+    if dialect == "postgresql":
+        search_vector = literal_column("products.search_vector")
+        ts_query = func.websearch_to_tsquery("english", keyword)
+        return (
+            select(Product)
+            .where(search_vector.op("@@")(ts_query))
+            .order_by(func.ts_rank_cd(search_vector, ts_query).desc(), Product.id)
+        )
+
+    if dialect == "sqlite":
+        weights = ", ".join(str(w) for w in FTS5_WEIGHTS)
+        return (
+            select(Product)
+            .join(products_fts, products_fts.c.rowid == Product.id)
+            .where(text("products_fts MATCH :fts_query").bindparams(fts_query=fts5_query(keyword)))
+            .order_by(text(f"bm25(products_fts, {weights})"), Product.id)
+        )
+
+    # No full-text support: unranked substring match, still bounded by the page
+    pattern = f"%{keyword}%"
+    return (
+        select(Product)
+        .where(or_(
+            Product.name.ilike(pattern),
+            Product.description.ilike(pattern),
+            Product.category.ilike(pattern),
+        ))
+        .order_by(Product.id)
+    )
+
+
+async def search_products(db: AsyncSession, keyword: str, page: int, limit: int):
+    if not keyword.split():
+        return []
+    query = build_search_query(db.bind.dialect.name, keyword).with_only_columns(*PRODUCT_COLUMNS)
+    result = await db.execute(query.offset((page - 1) * limit).limit(limit))
+    return result.all()
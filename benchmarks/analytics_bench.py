@@ -0,0 +1,108 @@
+"""Revenue-by-category for the last 30 days: ad-hoc SUM over orders vs rollups.
+
+"ad-hoc" is the query the dashboards used to run, joining ``orders``,
+``order_items`` and ``products`` for every request; "rollup" reads
+``sales_daily_category``. The rollup time should stay flat as ``--orders``
+grows while the ad-hoc scan grows with the history. Also reports how long
+the full rebuild (``python -m app.analytics.rebuild``) takes.
+
+    python -m benchmarks.analytics_bench --orders 200000 --days 365
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import bootstrap_env, create_schema, percentile
+
+
+def seed(engine, orders, days, products, rng):
+    from app.auth.models import RoleEnum, User
+    from app.orders.models import Order, OrderItem, OrderStatus
+    from app.products.models import Product
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"name": "bench", "email": "bench@gmail.com", "hashed_password": "x", "role": RoleEnum.user}])
+        conn.execute(Product.__table__.insert(), [
+            {"name": f"product {i}", "description": "bench", "price": 5 + i % 50, "stock": 100, "category": f"category {i % 20}"}
+            for i in range(products)
+        ])
+        for start in range(0, orders, 10000):
+            count = min(10000, orders - start)
+            conn.execute(Order.__table__.insert(), [
+                {"user_id": 1, "total_amount": 0, "status": OrderStatus.paid,
+                 "created_at": now - timedelta(days=days) + timedelta(seconds=(start + i) * days * 86400 // orders)}
+                for i in range(count)
+            ])
+            lines = [(start + i + 1, rng.randrange(1, products + 1)) for i in range(count) for _ in range(3)]
+            conn.execute(OrderItem.__table__.insert(), [
+                {"order_id": order_id, "product_id": product_id, "quantity": rng.randrange(1, 4),
+                 "price_at_purchase": rng.randrange(5, 55), "category": f"category {(product_id - 1) % 20}"}
+                for order_id, product_id in lines
+            ])
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run(orders, days, products, repeat):
+    bootstrap_env()
+    from sqlalchemy import func, select
+    from app.analytics.models import SalesDailyCategory
+    from app.analytics.rebuild import rebuild
+    from app.core.database import async_engine, engine
+    from app.orders.models import Order, OrderItem, OrderStatus
+    from app.products.models import Product
+
+    create_schema(engine)
+    started = time.perf_counter()
+    seed(engine, orders, days, products, random.Random(1))
+    print(f"seeded {orders} orders in {time.perf_counter() - started:.1f}s")
+
+    async def backfill():
+        try:
+            return await rebuild(5000)
+        finally:
+            if async_engine is not None:
+                await async_engine.dispose()
+
+    started = time.perf_counter()
+    rolled = asyncio.run(backfill())
+    print(f"rebuild rolled up {rolled} orders in {time.perf_counter() - started:.1f}s")
+
+    since = datetime.utcnow() - timedelta(days=30)
+    ad_hoc = (
+        select(Product.category, func.count(func.distinct(Order.id)), func.sum(OrderItem.quantity * OrderItem.price_at_purchase))
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .where(Order.status == OrderStatus.paid, Order.created_at >= since)
+        .group_by(Product.category)
+    )
+    rollup = (
+        select(SalesDailyCategory.category, func.sum(SalesDailyCategory.orders), func.sum(SalesDailyCategory.revenue))
+        .where(SalesDailyCategory.day >= since.date())
+        .group_by(SalesDailyCategory.category)
+    )
+    print(f"{'query':<10}{'p50 ms':>9}{'p99 ms':>9}")
+    with engine.connect() as conn:
+        for name, statement in (("ad-hoc", ad_hoc), ("rollup", rollup)):
+            samples = timed(lambda: conn.execute(statement).all(), repeat)
+            print(f"{name:<10}{percentile(samples, 50):>9.2f}{percentile(samples, 99):>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=200000)
+    parser.add_argument("--days", type=int, default=365, help="history the orders are spread over")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each query")
+    args = parser.parse_args()
+    run(args.orders, args.days, args.products, args.repeat)
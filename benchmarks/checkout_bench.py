@@ -0,0 +1,104 @@
+"""Round trips and latency of checkout as the cart grows.
+
+Compares the set-based engine in ``app.checkout.engine`` with the previous
+per-line implementation. Runs against a throwaway SQLite file unless
+DATABASE_URL points somewhere else.
+
+    python -m benchmarks.checkout_bench --sizes 1 5 10 30 --runs 200
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import bootstrap_env, create_schema, percentile, StatementCounter
+
+
+async def legacy_place_order(db, user_id):
+    from sqlalchemy import select
+    from app.cart.models import Cart
+    from app.orders import models as order_models
+    from app.products.models import Product
+
+    cart_items = (await db.execute(select(Cart).filter_by(user_id=user_id))).scalars().all()
+    total_amount = 0
+    order_items = []
+    for item in cart_items:
+        product = (await db.execute(
+            select(Product).filter(Product.id == item.product_id).with_for_update()
+        )).scalars().first()
+        product.stock -= item.quantity
+        total_amount += product.price * item.quantity
+        order_items.append(order_models.OrderItem(
+            product_id=item.product_id,
+            quantity=item.quantity,
+            price_at_purchase=product.price
+        ))
+    order = order_models.Order(
+        user_id=user_id,
+        total_amount=total_amount,
+        status=order_models.OrderStatus.paid,
+        items=order_items
+    )
+    db.add(order)
+    for item in cart_items:
+        await db.delete(item)
+    await db.flush()
+    return order.id
+
+
+def seed(session_factory, max_size):
+    from app.auth.models import User, RoleEnum
+    from app.products.models import Product
+
+    with session_factory() as db:
+        user = User(name="bench", email="bench@gmail.com", hashed_password="x", role=RoleEnum.user)
+        db.add(user)
+        db.add_all(
+            Product(name=f"product {i}", description="bench", price=10 + i, stock=10**9, category="bench")
+            for i in range(max_size)
+        )
+        db.commit()
+        return user.id
+
+
+async def fill_cart(db, user_id, size):
+    from app.cart.models import Cart
+
+    db.add_all(Cart(user_id=user_id, product_id=pid, quantity=1) for pid in range(1, size + 1))
+    await db.commit()
+
+
+async def run(sizes, runs):
+    bootstrap_env()
+    from app.core.database import engine, SessionLocal, async_engine, AsyncSessionLocal
+    from app.checkout.engine import place_order
+
+    create_schema(engine)
+    user_id = seed(SessionLocal, max(sizes))
+    counter = StatementCounter(async_engine.sync_engine)
+
+    print(f"{'impl':<10}{'cart':>6}{'stmts':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, impl in (("legacy", legacy_place_order), ("set-based", place_order)):
+        for size in sizes:
+            latencies = []
+            statements = 0
+            for _ in range(runs):
+                async with AsyncSessionLocal() as db:
+                    await fill_cart(db, user_id, size)
+                    with counter.measure() as sample:
+                        await impl(db, user_id)
+                        await db.commit()
+                latencies.append(sample["seconds"] * 1000)
+                statements = sample["statements"]
+            print(
+                f"{name:<10}{size:>6}{statements:>8}"
+                f"{percentile(latencies, 50):>10.2f}{percentile(latencies, 99):>10.2f}"
+            )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 30])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.runs))
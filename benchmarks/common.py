@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def bootstrap_env(database_url: str = None) -> str:
+    """Fill in the settings the app needs so benchmarks run without a .env file.
+
+    Must be called before anything under ``app`` is imported.
+    """
+    if database_url is None:
+        database_url = os.environ.get("DATABASE_URL")
+    if database_url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+        database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("EMAIL_FROM", "bench@example.com")
+    os.environ.setdefault("EMAIL_PASSWORD", "bench")
+    os.environ.setdefault("EMAIL_SERVER", "localhost")
+    os.environ.setdefault("EMAIL_PORT", "1025")
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+    os.environ.setdefault("REFRESH_TOKEN_EXPIRE_MINUTES", "1440")
+    return database_url
+
+
+def create_schema(engine):
+    from app.core.database import Base
+    import app.auth.models  # noqa: F401
+    import app.products.models  # noqa: F401
+    import app.cart.models  # noqa: F401
+    import app.orders.models  # noqa: F401
+    import app.mail.models  # noqa: F401
+    import app.idempotency.models  # noqa: F401
+    import app.analytics.models  # noqa: F401
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class StatementCounter:
+    """Counts statements sent to the database through an engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    @contextmanager
+    def measure(self):
+        start = self.count
+        result = {}
+        began = time.perf_counter()
+        yield result
+        result["seconds"] = time.perf_counter() - began
+        result["statements"] = self.count - start
@@ -0,0 +1,124 @@
+"""Many buyers checking out the same product at once: throughput and overselling.
+
+Every buyer has one unit of a single SKU in the cart and all of them call
+checkout together. "locking" is the original per-line checkout (SELECT ...
+FOR UPDATE, check in Python, write back); "conditional" is the current
+engine, which decrements with ``UPDATE ... WHERE stock >= :q RETURNING``.
+Afterwards the stock left plus the units sold must equal the starting stock.
+
+Meaningful lock behaviour needs PostgreSQL (DATABASE_URL=postgresql://...);
+on SQLite all writers share one database lock.
+
+    python -m benchmarks.flash_sale_bench --buyers 500 --stock 200
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.checkout_bench import legacy_place_order
+from benchmarks.common import bootstrap_env, create_schema, percentile
+
+
+def seed(engine, buyers):
+    from app.auth.models import RoleEnum, User
+    from app.products.models import Product
+
+    with engine.begin() as conn:
+        conn.execute(Product.__table__.insert(), [
+            {"name": "limited drop", "description": "bench", "price": 99, "stock": 0, "category": "bench"}
+        ])
+        conn.execute(User.__table__.insert(), [
+            {"name": f"buyer {i}", "email": f"buyer{i}@gmail.com", "hashed_password": "x", "role": RoleEnum.user}
+            for i in range(buyers)
+        ])
+
+
+def reset(engine, buyers, stock):
+    from app.cart.models import Cart
+    from app.orders.models import Order, OrderItem
+    from app.products.models import Product
+
+    with engine.begin() as conn:
+        conn.execute(OrderItem.__table__.delete())
+        conn.execute(Order.__table__.delete())
+        conn.execute(Cart.__table__.delete())
+        conn.execute(Product.__table__.update().values(stock=stock))
+        conn.execute(Cart.__table__.insert(), [
+            {"user_id": user_id, "product_id": 1, "quantity": 1} for user_id in range(1, buyers + 1)
+        ])
+
+
+async def buy(impl, user_id, start, outcomes, latencies):
+    from fastapi import HTTPException
+    from app.core.database import AsyncSessionLocal
+
+    await start.wait()
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        try:
+            await impl(db, user_id)
+            await db.commit()
+            outcome = "sold"
+        except HTTPException as e:
+            await db.rollback()
+            outcome = {400: "sold out", 503: "busy"}.get(e.status_code, str(e.status_code))
+        except Exception as e:
+            await db.rollback()
+            outcome = type(e).__name__
+    latencies.append((time.perf_counter() - started) * 1000)
+    outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+
+async def sale(impl, buyers):
+    start, outcomes, latencies = asyncio.Event(), {}, []
+    tasks = [asyncio.create_task(buy(impl, user_id, start, outcomes, latencies)) for user_id in range(1, buyers + 1)]
+    await asyncio.sleep(0)
+    began = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - began, outcomes, latencies
+
+
+def sold_units(engine):
+    from sqlalchemy import func, select
+    from app.orders.models import OrderItem
+    from app.products.models import Product
+
+    with engine.connect() as conn:
+        stock = conn.scalar(select(Product.stock).where(Product.id == 1))
+        sold = conn.scalar(select(func.coalesce(func.sum(OrderItem.quantity), 0)))
+    return stock, sold
+
+
+async def run(buyers, stock):
+    bootstrap_env()
+    from app.checkout.engine import place_order
+    from app.core.database import async_engine, engine
+
+    create_schema(engine)
+    seed(engine, buyers)
+    print(f"{'impl':<13}{'seconds':>9}{'buyers/s':>10}{'orders/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'left':>6}{'sold':>6}  outcomes")
+    try:
+        for name, impl in (("locking", legacy_place_order), ("conditional", place_order)):
+            reset(engine, buyers, stock)
+            elapsed, outcomes, latencies = await sale(impl, buyers)
+            left, sold = sold_units(engine)
+            oversold = left < 0 or left + sold != stock
+            print(
+                f"{name:<13}{elapsed:>9.2f}{buyers / elapsed:>10.1f}{outcomes.get('sold', 0) / elapsed:>10.1f}"
+                f"{percentile(latencies, 50):>9.1f}{percentile(latencies, 99):>9.1f}{left:>6}{sold:>6}  "
+                + ", ".join(f"{key}={value}" for key, value in sorted(outcomes.items()))
+                + ("  OVERSOLD" if oversold else "")
+            )
+            if name == "conditional":
+                assert not oversold, "conditional decrement oversold"
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buyers", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=200, help="units on sale; fewer than buyers to force sell-outs")
+    args = parser.parse_args()
+    asyncio.run(run(args.buyers, args.stock))
@@ -0,0 +1,56 @@
+"""Password hashes per second, single-threaded and through the hashing executor.
+
+    python -m benchmarks.hashing_bench --seconds 5
+    PASSWORD_HASH_SCHEME=argon2 python -m benchmarks.hashing_bench
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import bootstrap_env
+
+
+def single_thread(hash_fn, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        hash_fn("correct horse battery staple")
+        count += 1
+    return count / seconds
+
+
+async def through_executor(executor, hash_fn, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal count
+        while time.perf_counter() < deadline:
+            await executor.run(hash_fn, "correct horse battery staple")
+            count += 1
+
+    await asyncio.gather(*(worker() for _ in range(executor.workers)))
+    return count / seconds
+
+
+def run(seconds):
+    bootstrap_env()
+    from app.core.config import settings
+    from app.auth.hashing import hashing_executor, pwd_context
+
+    cores = os.cpu_count() or 1
+    single = single_thread(pwd_context.hash, seconds)
+    pooled = asyncio.run(through_executor(hashing_executor, pwd_context.hash, seconds))
+    hashing_executor.shutdown()
+
+    print(f"scheme: {settings.password_hash_scheme}  cores: {cores}  workers: {hashing_executor.workers}")
+    print(f"single thread:   {single:8.1f} hashes/s")
+    print(f"executor:        {pooled:8.1f} hashes/s  ({pooled / hashing_executor.workers:.1f} per worker)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    run(args.seconds)
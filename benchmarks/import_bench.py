@@ -0,0 +1,87 @@
+"""Bulk import and export throughput in rows per second.
+
+Feeds a generated supplier file through the same parser and upsert path as
+``/admin/products/import``, once as fresh inserts and once as updates of the
+same SKUs, then streams the catalog back out. Uses COPY when DATABASE_URL
+points at PostgreSQL, multi-row INSERT ... ON CONFLICT otherwise.
+
+    python -m benchmarks.import_bench --rows 200000 --format csv
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import time
+
+from benchmarks.common import bootstrap_env, create_schema
+
+CATEGORIES = ["home", "garden", "kitchen", "outdoor", "tools", "apparel", "office"]
+
+
+def supplier_file(rows, fmt, seed):
+    rng = random.Random(seed)
+    records = [
+        {
+            "sku": f"SKU-{i:08d}",
+            "name": f"product {i}",
+            "description": "imported from the supplier feed",
+            "price": round(rng.uniform(1, 500), 2),
+            "stock": rng.randint(0, 100),
+            "category": rng.choice(CATEGORIES),
+            "image_url": f"https://cdn.example.com/{i}.jpg",
+        }
+        for i in range(rows)
+    ]
+    if fmt == "ndjson":
+        return "".join(json.dumps(record) + "\n" for record in records).encode()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(records[0]))
+    writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue().encode()
+
+
+async def body_chunks(body, size=64 * 1024):
+    # what request.stream() hands the endpoint
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def run(rows, fmt):
+    bootstrap_env()
+    from app.core.database import engine, async_engine, session_scope
+    from app.products import bulk
+
+    create_schema(engine)
+    parser = bulk.iter_csv if fmt == "csv" else bulk.iter_ndjson
+
+    print(f"{'pass':<10}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for label, seed in (("insert", 1), ("update", 2)):
+        body = supplier_file(rows, fmt, seed)
+        started = time.perf_counter()
+        async with session_scope() as db:
+            report = await bulk.import_products(db, parser(body_chunks(body)))
+        elapsed = time.perf_counter() - started
+        assert report.failed == 0, report.errors[:5]
+        print(f"{label:<10}{report.upserted:>10}{elapsed:>10.2f}{report.upserted / elapsed:>12.0f}")
+
+    started = time.perf_counter()
+    exported = 0
+    async with session_scope() as db:
+        async for chunk in bulk.export_products(db, fmt):
+            exported += chunk.count(b"\n")
+    exported -= 1 if fmt == "csv" else 0
+    elapsed = time.perf_counter() - started
+    print(f"{'export':<10}{exported:>10}{elapsed:>10.2f}{exported / elapsed:>12.0f}")
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.format))
@@ -0,0 +1,75 @@
+"""Peak Python memory of the admin product listing: buffered vs. streamed.
+
+The buffered path is the previous endpoint (every ORM object, then one list
+of ProductOut and one JSON body); the streamed path drains the body of
+``stream_query`` chunk by chunk, as the ASGI server would.
+
+    python -m benchmarks.listing_memory_bench --products 200000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.common import bootstrap_env, create_schema
+from benchmarks.search_bench import seed
+
+
+async def buffered(db):
+    from typing import List
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from app.products.models import Product
+    from app.products.schemas import ProductOut
+
+    products = (await db.execute(select(Product))).scalars().all()
+    return len(TypeAdapter(List[ProductOut]).dump_json(products))
+
+
+async def streamed(_db):
+    from sqlalchemy import select
+    from app.core.streaming import stream_query
+    from app.products.models import Product
+    from app.products.schemas import ProductOut
+
+    response = stream_query(select(*Product.__table__.columns).order_by(Product.id), ProductOut)
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+async def measure(label, impl):
+    from app.core.database import session_scope
+
+    # timed and traced separately: tracemalloc slows allocation-heavy code unevenly
+    started = time.perf_counter()
+    async with session_scope() as db:
+        size = await impl(db)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    async with session_scope() as db:
+        await impl(db)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10}{size / 2**20:>10.1f}{peak / 2**20:>12.1f}{elapsed:>10.2f}")
+
+
+async def run(products):
+    bootstrap_env()
+    from app.core.database import engine, async_engine
+
+    create_schema(engine)
+    seed(engine, products)
+    print(f"{'listing':<10}{'body MB':>10}{'peak MB':>12}{'seconds':>10}")
+    await measure("buffered", buffered)
+    await measure("streamed", streamed)
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.products))
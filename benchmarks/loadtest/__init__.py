@@ -0,0 +1,5 @@
+"""Load test of the browse -> cart -> checkout journey against a running app.
+
+Seeds a database, boots ``app.main:app`` under uvicorn and drives weighted
+scenarios with async httpx clients; see ``python -m benchmarks.loadtest -h``.
+"""
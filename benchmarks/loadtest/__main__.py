@@ -0,0 +1,158 @@
+"""Seed, boot the app, drive weighted shopper scenarios and report per endpoint.
+
+Runs against a throwaway SQLite file unless DATABASE_URL points at a
+PostgreSQL database (which is dropped and re-seeded). Every shopper follows
+its own seeded random stream, so two runs with the same flags send the same
+requests. ``--save`` writes a JSON baseline; ``--baseline`` exits non-zero
+when a run is slower than it by more than ``--tolerance``.
+
+    python -m benchmarks.loadtest --concurrency 20 --iterations 50 --save baseline.json
+    python -m benchmarks.loadtest --concurrency 20 --iterations 50 --baseline baseline.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import bootstrap_env, create_schema
+from benchmarks.loadtest.report import Recorder, compare, load_baseline, print_report, save_baseline, summarize
+from benchmarks.loadtest.scenarios import SCENARIOS, Shopper, parse_weights
+from benchmarks.loadtest.seed import seed
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(workers: int, startup_timeout: float = 60):
+    """Run ``app.main:app`` under uvicorn in a child process; yields its base URL."""
+    port = free_port()
+    env = {**os.environ, "LOG_FILE": os.environ.get("LOG_FILE", ""), "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING")}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode} during startup")
+            try:
+                if httpx.get(f"{url}/health/ready", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"app not ready after {startup_timeout}s")
+            time.sleep(0.2)
+        yield url
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+async def shop(shopper: Shopper, names, weights, iterations: int):
+    for _ in range(iterations):
+        name = shopper.rng.choices(names, weights)[0]
+        await SCENARIOS[name][0](shopper)
+
+
+async def drive(url: str, args, weights: dict, recorder: Recorder) -> float:
+    names = [name for name, weight in weights.items() if weight > 0]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=args.timeout) as client:
+        def shoppers(offset):
+            return [
+                Shopper(client, i, args.products, recorder, random.Random(args.seed * 100_003 + i))
+                for i in range(offset, offset + args.concurrency)
+            ]
+
+        measured, warming = shoppers(0), shoppers(args.concurrency)
+        recorder.enabled = False
+        # first sign-ins queue up on password hashing all at once; keep them out of the numbers
+        await asyncio.gather(*(s.sign_in() for s in measured + warming))
+        await asyncio.gather(*(shop(s, names, [weights[n] for n in names], args.warmup) for s in warming))
+        recorder.enabled = True
+        started = time.perf_counter()
+        await asyncio.gather(*(shop(s, names, [weights[n] for n in names], args.iterations) for s in measured))
+        return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual shoppers running at once")
+    parser.add_argument("--iterations", type=int, default=50, help="scenarios per shopper")
+    parser.add_argument("--warmup", type=int, default=5, help="unrecorded scenarios per shopper first")
+    parser.add_argument("--weights", default="", help='e.g. "browse=50,checkout=10" (defaults: %s)' % ", ".join(
+        f"{name}={weight}" for name, (_, weight) in SCENARIOS.items()))
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--orders-per-user", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--url", help="drive an already running, already seeded app instead")
+    parser.add_argument("--save", metavar="PATH", help="write this run as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="fail if this run regresses against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression, 0.15 = 15%%")
+    args = parser.parse_args(argv)
+    weights = parse_weights(args.weights)
+
+    database_url = bootstrap_env()
+    config = {
+        "concurrency": args.concurrency, "iterations": args.iterations, "weights": weights,
+        "products": args.products, "orders_per_user": args.orders_per_user, "seed": args.seed,
+        "workers": args.workers, "database": database_url.split(":", 1)[0],
+    }
+    recorder = Recorder()
+    if args.url:
+        elapsed = asyncio.run(drive(args.url, args, weights, recorder))
+    else:
+        from app.core.database import engine
+
+        started = time.perf_counter()
+        create_schema(engine)
+        # warm-up shoppers use their own accounts, after the measured ones
+        seed(engine, args.concurrency * 2, args.products, args.orders_per_user, random.Random(args.seed))
+        engine.dispose()
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+        with serve(args.workers) as url:
+            elapsed = asyncio.run(drive(url, args, weights, recorder))
+
+    summary = summarize(recorder, elapsed)
+    print_report(summary)
+    if args.save:
+        save_baseline(args.save, summary, config)
+        print(f"baseline written to {args.save}")
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        if baseline.get("config") != config:
+            print("warning: baseline was recorded with different settings", file=sys.stderr)
+        problems = compare(summary, baseline, args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            return 1
+        print(f"no regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Per-endpoint statistics, baseline files and the regression check."""
+import json
+from collections import defaultdict
+
+from benchmarks.common import percentile
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # endpoint -> seconds
+        self.errors = defaultdict(lambda: defaultdict(int))  # endpoint -> status/exception -> count
+        self.enabled = True  # off during warm-up
+
+    def record(self, name: str, seconds: float, error: str = None):
+        if not self.enabled:
+            return
+        self.latencies[name].append(seconds)
+        if error is not None:
+            self.errors[name][error] += 1
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for name, samples in sorted(recorder.latencies.items()):
+        ms = [sample * 1000 for sample in samples]
+        errors = sum(recorder.errors[name].values())
+        endpoints[name] = {
+            "count": len(ms),
+            "rps": round(len(ms) / elapsed, 2),
+            "p50_ms": round(percentile(ms, 50), 2),
+            "p95_ms": round(percentile(ms, 95), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+            "error_rate": round(errors / len(ms), 4),
+            "errors": dict(recorder.errors[name]),
+        }
+    total = sum(item["count"] for item in endpoints.values())
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+def print_report(summary: dict):
+    print(f"{'endpoint':<30}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, item in summary["endpoints"].items():
+        print(
+            f"{name:<30}{item['count']:>8}{item['rps']:>9.1f}{item['p50_ms']:>9.2f}"
+            f"{item['p95_ms']:>9.2f}{item['p99_ms']:>9.2f}{sum(item['errors'].values()):>8}"
+        )
+    print(f"{summary['requests']} requests in {summary['elapsed_s']}s, {summary['rps']} req/s")
+
+
+def save_baseline(path: str, summary: dict, config: dict):
+    with open(path, "w") as f:
+        json.dump({"config": config, **summary}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions beyond ``tolerance`` (0.15 = 15%) against a saved baseline.
+
+    An endpoint regresses when its p95 latency grows, its throughput drops,
+    or its error rate rises by more than the tolerance allows.
+    """
+    problems = []
+    if summary["rps"] < baseline["rps"] * (1 - tolerance):
+        problems.append(f"overall throughput {summary['rps']} req/s < baseline {baseline['rps']} req/s")
+    for name, base in baseline["endpoints"].items():
+        current = summary["endpoints"].get(name)
+        if current is None:
+            problems.append(f"{name}: not exercised in this run")
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {current['p95_ms']} ms > baseline {base['p95_ms']} ms")
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: {current['rps']} req/s < baseline {base['rps']} req/s")
+        if current["error_rate"] > base["error_rate"] + tolerance / 100:
+            problems.append(f"{name}: error rate {current['error_rate']:.2%} > baseline {base['error_rate']:.2%}")
+    return problems
@@ -0,0 +1,98 @@
+"""What a virtual shopper does; each scenario is one weighted step of a run."""
+import random
+import time
+
+from benchmarks.loadtest.seed import PASSWORD, email
+from benchmarks.search_bench import CATEGORIES, WEIGHTS, WORDS
+
+
+class Shopper:
+    """One virtual user: an httpx client, its account and its own random stream."""
+
+    def __init__(self, client, index: int, products: int, recorder, rng: random.Random):
+        self.client = client
+        self.index = index
+        self.products = products
+        self.recorder = recorder
+        self.rng = rng
+        self.headers = {}
+
+    async def request(self, name: str, method: str, url: str, expect=(200,), **kwargs):
+        """Send one request and record its latency under ``name`` (the route, not the URL)."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except Exception as e:
+            self.recorder.record(name, time.perf_counter() - started, type(e).__name__)
+            return None
+        status = response.status_code
+        self.recorder.record(name, time.perf_counter() - started, None if status in expect else str(status))
+        return response
+
+    async def sign_in(self):
+        response = await self.request(
+            "POST /auth/signin", "POST", "/auth/signin", json={"email": email(self.index), "password": PASSWORD}
+        )
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def product_id(self) -> int:
+        # popular products get most of the traffic
+        return min(self.products, int(self.rng.paretovariate(1.2)))
+
+
+async def browse(shopper: Shopper):
+    params = {"page": shopper.rng.randint(1, 5), "limit": 20, "sort_by": shopper.rng.choice(["name", "price"])}
+    if shopper.rng.random() < 0.5:
+        params["category"] = shopper.rng.choice(CATEGORIES)
+    await shopper.request("GET /products/", "GET", "/products/", params=params)
+    for _ in range(shopper.rng.randint(1, 3)):
+        await shopper.request("GET /products/{product_id}", "GET", f"/products/{shopper.product_id()}")
+
+
+async def search(shopper: Shopper):
+    keyword = " ".join(shopper.rng.choices(WORDS, WEIGHTS, k=shopper.rng.choice([1, 2])))
+    await shopper.request("GET /products/search", "GET", "/products/search", params={"keyword": keyword, "limit": 20})
+
+
+async def sign_in(shopper: Shopper):
+    await shopper.sign_in()
+
+
+async def add_to_cart(shopper: Shopper):
+    await shopper.request(
+        "POST /cart/", "POST", "/cart/", json={"product_id": shopper.product_id(), "quantity": shopper.rng.randint(1, 2)}
+    )
+    await shopper.request("GET /cart/", "GET", "/cart/")
+
+
+async def checkout(shopper: Shopper):
+    for _ in range(shopper.rng.randint(1, 3)):
+        await shopper.request("POST /cart/", "POST", "/cart/", json={"product_id": shopper.product_id(), "quantity": 1})
+    await shopper.request("POST /checkout", "POST", "/checkout", expect=(201,))
+
+
+async def order_history(shopper: Shopper):
+    await shopper.request("GET /orders/", "GET", "/orders/", params={"limit": 20})
+
+
+# name -> (scenario, default weight)
+SCENARIOS = {
+    "browse": (browse, 45),
+    "search": (search, 20),
+    "sign_in": (sign_in, 3),
+    "add_to_cart": (add_to_cart, 15),
+    "checkout": (checkout, 7),
+    "order_history": (order_history, 10),
+}
+
+
+def parse_weights(spec: str) -> dict:
+    """``"browse=50,checkout=10"`` over the defaults; a weight of 0 disables a scenario."""
+    weights = {name: weight for name, (_, weight) in SCENARIOS.items()}
+    for part in filter(None, (item.strip() for item in (spec or "").split(","))):
+        name, _, value = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(value)
+    return weights
@@ -0,0 +1,59 @@
+"""Deterministic catalog, accounts and order history for a load test run."""
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.search_bench import CATEGORIES, WEIGHTS, WORDS
+
+PASSWORD = "loadtest1"
+
+
+def email(index: int) -> str:
+    return f"shopper{index}@gmail.com"
+
+
+def seed(engine, users: int, products: int, orders_per_user: int, rng: random.Random, chunk: int = 5000):
+    """Insert ``products`` products, ``users`` shoppers sharing one password, and past orders."""
+    from app.auth.models import RoleEnum, User
+    from app.auth.utils import hash_password
+    from app.orders.models import Order, OrderItem, OrderStatus
+    from app.products.models import Product
+
+    hashed = hash_password(PASSWORD)  # one hash for every account; hashing is what sign-in measures
+    prices = {}
+    with engine.begin() as conn:
+        for start in range(0, products, chunk):
+            rows = []
+            for offset in range(min(chunk, products - start)):
+                price = round(rng.lognormvariate(3, 1), 2)
+                prices[start + offset + 1] = price
+                rows.append({
+                    "sku": f"LT-{start + offset + 1:07d}",
+                    "name": " ".join(rng.choices(WORDS, WEIGHTS, k=3)),
+                    "description": " ".join(rng.choices(WORDS, WEIGHTS, k=12)),
+                    "price": price,
+                    "stock": 10**6,  # checkout must not run dry mid-run
+                    "category": rng.choice(CATEGORIES),
+                    "image_url": None,
+                })
+            conn.execute(Product.__table__.insert(), rows)
+
+        conn.execute(User.__table__.insert(), [
+            {"name": f"Shopper {i}", "email": email(i), "hashed_password": hashed, "role": RoleEnum.user}
+            for i in range(users)
+        ])
+        user_ids = [row.id for row in conn.execute(User.__table__.select().order_by(User.id))]
+
+        now = datetime.utcnow()
+        for user_id in user_ids:
+            for n in range(orders_per_user):
+                lines = [(rng.randint(1, products), rng.randint(1, 3)) for _ in range(rng.randint(1, 4))]
+                order_id = conn.execute(Order.__table__.insert().values(
+                    user_id=user_id,
+                    total_amount=round(sum(prices[pid] * qty for pid, qty in lines), 2),
+                    created_at=now - timedelta(days=rng.uniform(0, 365)),
+                    status=OrderStatus.paid,
+                )).inserted_primary_key[0]
+                conn.execute(OrderItem.__table__.insert(), [
+                    {"order_id": order_id, "product_id": pid, "quantity": qty, "price_at_purchase": prices[pid]}
+                    for pid, qty in lines
+                ])
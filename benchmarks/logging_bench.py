@@ -0,0 +1,101 @@
+"""Time a log call costs the request thread: old handlers vs. the queued pipeline.
+
+"before" is the previous setup: basicConfig with a FileHandler and a
+StreamHandler, and f-string messages built at the call site. "after" is
+``configure_logging`` (JSON, rotation, writer thread) with %-style calls,
+and then the same with INFO sampling on the chatty logger. Console output
+goes to /dev/null in every case so only the logging machinery is measured.
+
+    python -m benchmarks.logging_bench --calls 20000 --threads 4
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import bootstrap_env, percentile
+
+
+class Item:
+    def __init__(self, user_id, product_id, quantity):
+        self.user_id = user_id
+        self.product_id = product_id
+        self.quantity = quantity
+
+
+def fstring_calls(logger, calls, latencies):
+    item = Item(42, 7, 3)
+    for i in range(calls):
+        started = time.perf_counter()
+        logger.info(f"Add to cart request by user {item.user_id} for product {item.product_id} (qty: {item.quantity})")
+        latencies.append(time.perf_counter() - started)
+
+
+def lazy_calls(logger, calls, latencies):
+    item = Item(42, 7, 3)
+    for i in range(calls):
+        started = time.perf_counter()
+        logger.info("Add to cart request by user %s for product %s (qty: %s)", item.user_id, item.product_id, item.quantity)
+        latencies.append(time.perf_counter() - started)
+
+
+def dropped():
+    return sum(getattr(handler, "dropped", 0) for handler in logging.getLogger().handlers)
+
+
+def measure(label, logger, body, calls, threads):
+    dropped_before = dropped()
+    per_thread = [[] for _ in range(threads)]
+    workers = [threading.Thread(target=body, args=(logger, calls, per_thread[i])) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    latencies = [sample * 1e6 for samples in per_thread for sample in samples]
+    print(
+        f"{label:<18}{sum(latencies) / len(latencies):>10.2f}{percentile(latencies, 50):>10.2f}"
+        f"{percentile(latencies, 99):>10.2f}{len(latencies) / elapsed:>14.0f}{dropped() - dropped_before:>10}"
+    )
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+
+def run(calls, threads):
+    directory = tempfile.mkdtemp(prefix="logbench-")
+    os.environ["LOG_FILE"] = os.path.join(directory, "after.log")
+    os.environ["LOG_SAMPLE_RATES"] = '{"bench.sampled": 0.1}'
+    bootstrap_env()
+    sys.stderr = open(os.devnull, "w")
+    print(f"{'setup':<18}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'calls/s':>14}{'dropped':>10}")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+        handlers=[logging.FileHandler(os.path.join(directory, "before.log")), logging.StreamHandler()],
+    )
+    measure("before (f-string)", logging.getLogger("bench.plain"), fstring_calls, calls, threads)
+    reset_root()
+
+    from app.core.logger import configure_logging, shutdown_logging
+    configure_logging()
+    measure("after (%-style)", logging.getLogger("bench.plain"), lazy_calls, calls, threads)
+    measure("after, 10% sampled", logging.getLogger("bench.sampled"), lazy_calls, calls, threads)
+    shutdown_logging()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000, help="log calls per thread")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    run(args.calls, args.threads)
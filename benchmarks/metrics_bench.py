@@ -0,0 +1,95 @@
+"""Cost of leaving Prometheus collection on: per request and per statement.
+
+Calls the real application's ASGI stack directly (no network, no server) on
+a route that does no database work, with and without PrometheusMiddleware,
+then runs ``SELECT 1`` on a bare engine with and without the statement hooks.
+
+    python -m benchmarks.metrics_bench --requests 20000 --queries 50000 --rounds 10
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import bootstrap_env
+
+
+async def call(app, path):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def timed_requests(app, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, "/")
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def per_request(plain, instrumented, requests, rounds):
+    """Best round of each, interleaved so drift hits both sides alike."""
+    off, on = [], []
+    for _ in range(rounds):
+        off.append(await timed_requests(plain, requests // rounds))
+        on.append(await timed_requests(instrumented, requests // rounds))
+    return min(off), min(on)
+
+
+def timed_queries(engine, queries):
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        started = time.perf_counter()
+        for _ in range(queries):
+            conn.execute(statement)
+        return (time.perf_counter() - started) / queries * 1e6
+
+
+def per_query(bare, hooked, queries, rounds):
+    off, on = [], []
+    for _ in range(rounds):
+        off.append(timed_queries(bare, queries // rounds))
+        on.append(timed_queries(hooked, queries // rounds))
+    return min(off), min(on)
+
+
+def run(requests, queries, rounds):
+    bootstrap_env()
+    from sqlalchemy import create_engine
+    from app.core.metrics import PrometheusMiddleware, instrument_engine
+    from app.main import app
+
+    # the app already carries the middleware; build_middleware_stack gives the bare stack
+    app.user_middleware = [m for m in app.user_middleware if m.cls is not PrometheusMiddleware]
+    plain = app.build_middleware_stack()
+    instrumented = PrometheusMiddleware(plain)
+
+    print(f"{'measure':<26}{'off us':>10}{'on us':>10}{'added us':>10}")
+    off, on = asyncio.run(per_request(plain, instrumented, requests, rounds))
+    print(f"{'request (GET /)':<26}{off:>10.2f}{on:>10.2f}{on - off:>10.2f}")
+
+    bare = create_engine("sqlite://")
+    hooked = create_engine("sqlite://")
+    instrument_engine(hooked)
+    off, on = per_query(bare, hooked, queries, rounds)
+    print(f"{'statement (SELECT 1)':<26}{off:>10.2f}{on:>10.2f}{on - off:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    run(args.requests, args.queries, args.rounds)
@@ -0,0 +1,117 @@
+"""Order history for a heavy buyer: unbounded list vs. keyset pages.
+
+Seeds one user with thousands of orders and walks the whole history a page
+at a time, checking that every page costs the same number of statements
+(one for the orders, one more when items are included) however deep it is.
+
+    python -m benchmarks.order_history_bench --orders 5000 --items 3 --limit 20
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import bootstrap_env, create_schema, percentile, StatementCounter
+
+
+def seed(engine, orders, items):
+    from app.auth.models import User, RoleEnum
+    from app.orders.models import Order, OrderItem, OrderStatus
+    from app.products.models import Product
+
+    rng = random.Random(3)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"name": f"buyer {i}", "email": f"buyer{i}@gmail.com", "hashed_password": "x", "role": RoleEnum.user}
+            for i in (1, 2)
+        ])
+        conn.execute(Product.__table__.insert(), [
+            {"name": f"product {i}", "description": "bench", "price": 10, "stock": 100, "category": "bench"}
+            for i in range(50)
+        ])
+        # the second user's orders interleave with the first's, as in a shared table
+        conn.execute(Order.__table__.insert(), [
+            {
+                "user_id": 1 + i % 2,
+                "total_amount": 10 * items,
+                "status": OrderStatus.paid,
+                # duplicate timestamps on purpose: id has to break the tie
+                "created_at": start + timedelta(minutes=i // 3),
+            }
+            for i in range(orders * 2)
+        ])
+        conn.execute(OrderItem.__table__.insert(), [
+            {"order_id": order_id, "product_id": rng.randint(1, 50), "quantity": 1, "price_at_purchase": 10}
+            for order_id in range(1, orders * 2 + 1)
+            for _ in range(items)
+        ])
+
+
+async def walk(counter, user_id, limit, include_items):
+    from app.core.database import AsyncSessionLocal
+    from app.core.pagination import encode_cursor
+    from app.orders.routes import load_order_page
+
+    after, seen, latencies, statements = None, [], [], set()
+    while True:
+        async with AsyncSessionLocal() as db:
+            with counter.measure() as sample:
+                orders = await load_order_page(db, user_id, limit, after, include_items)
+                if include_items:
+                    sum(len(order.items) for order in orders)
+        latencies.append(sample["seconds"] * 1000)
+        if orders:
+            # an empty last page has no items to select
+            statements.add(sample["statements"])
+        seen.extend(order.id for order in orders)
+        if len(orders) < limit:
+            break
+        after = encode_cursor([orders[-1].created_at.isoformat(), orders[-1].id])
+    return seen, latencies, statements
+
+
+async def unbounded(counter, user_id):
+    from sqlalchemy import select
+    from app.core.database import AsyncSessionLocal
+    from app.orders.models import Order
+
+    async with AsyncSessionLocal() as db:
+        with counter.measure() as sample:
+            (await db.execute(select(Order).filter(Order.user_id == user_id))).scalars().all()
+    return sample["seconds"] * 1000
+
+
+async def run(orders, items, limit):
+    bootstrap_env()
+    from app.core.database import engine, async_engine
+
+    create_schema(engine)
+    seed(engine, orders, items)
+    counter = StatementCounter(async_engine.sync_engine)
+
+    try:
+        print(f"{'history':<22}{'pages':>7}{'stmts/page':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for include_items in (False, True):
+            seen, latencies, statements = await walk(counter, 1, limit, include_items)
+            assert len(seen) == len(set(seen)) == orders, "pages skipped or repeated orders"
+            assert seen == sorted(seen, reverse=True), "pages out of order"
+            assert len(statements) == 1, f"statement count varies by page: {sorted(statements)}"
+            label = "keyset + items" if include_items else "keyset"
+            print(
+                f"{label:<22}{len(latencies):>7}{statements.pop():>12}"
+                f"{percentile(latencies, 50):>10.2f}{percentile(latencies, 99):>10.2f}"
+            )
+        full = await unbounded(counter, 1)
+        print(f"{'unbounded (before)':<22}{1:>7}{1:>12}{full:>10.2f}{full:>10.2f}")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.orders, args.items, args.limit))
@@ -0,0 +1,91 @@
+"""Product search latency on a large catalog: ranked full-text vs. ILIKE scan.
+
+Seeds a throwaway SQLite catalog (FTS5 index included) unless DATABASE_URL
+points at a PostgreSQL database, then times both query shapes.
+
+    python -m benchmarks.search_bench --products 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.common import bootstrap_env, create_schema, percentile
+
+SYLLABLES = ["ka", "lo", "mi", "ter", "ron", "vi", "sa", "nel", "por", "du", "ex", "qua", "bri", "zo"]
+CATEGORIES = ["home", "garden", "kitchen", "outdoor", "tools", "apparel", "office"]
+
+
+def vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+# A few thousand terms drawn with a skewed distribution, like a real catalog
+WORDS = vocabulary(5000, random.Random(1))
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+
+def seed(engine, count, chunk=20000):
+    from app.products.models import Product
+
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        for start in range(0, count, chunk):
+            rows = [
+                {
+                    "name": " ".join(rng.choices(WORDS, WEIGHTS, k=3)),
+                    "description": " ".join(rng.choices(WORDS, WEIGHTS, k=12)),
+                    "price": round(rng.uniform(1, 500), 2),
+                    "stock": rng.randint(0, 100),
+                    "category": rng.choice(CATEGORIES),
+                    "image_url": None,
+                }
+                for _ in range(min(chunk, count - start))
+            ]
+            conn.execute(Product.__table__.insert(), rows)
+
+
+async def time_queries(label, build, keywords, limit):
+    from app.core.database import AsyncSessionLocal
+
+    latencies = []
+    async with AsyncSessionLocal() as db:
+        for keyword in keywords:
+            started = time.perf_counter()
+            query = build(db, keyword)
+            if limit:
+                query = query.limit(limit)
+            (await db.execute(query)).scalars().all()
+            latencies.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<12}{percentile(latencies, 50):>10.2f}{percentile(latencies, 95):>10.2f}{percentile(latencies, 99):>10.2f}")
+
+
+async def run(products, queries):
+    bootstrap_env()
+    from app.core.database import engine, async_engine
+    from app.products.search import build_search_query
+
+    create_schema(engine)
+    started = time.perf_counter()
+    seed(engine, products)
+    print(f"seeded {products} products in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(7)
+    keywords = [" ".join(rng.choices(WORDS, WEIGHTS, k=rng.choice([1, 2]))) for _ in range(queries)]
+    print(f"{'query':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    # ranked page of 20, as served by /products/search
+    await time_queries("full-text", lambda db, kw: build_search_query(db.bind.dialect.name, kw), keywords, 20)
+    # the previous endpoint: three ILIKE predicates, every match returned
+    await time_queries("ilike scan", lambda db, kw: build_search_query("other", kw), keywords, None)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.products, args.queries))
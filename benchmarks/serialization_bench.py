@@ -0,0 +1,116 @@
+"""Objects per second turned into a JSON body, for product and order payloads.
+
+"response_model" is the previous path: ORM objects (or models built from
+them) validated by FastAPI's response field, encoded to JSON-compatible
+Python and rendered by the stdlib ``json`` module; "+ orjson" renders the
+same with ORJSONResponse. "TypeAdapter" validates the ORM objects once in a
+cached adapter and encodes in pydantic-core. "trusted rows" dumps a column
+projection with orjson and no validation.
+
+    python -m benchmarks.serialization_bench --page 100 --seconds 1
+"""
+import argparse
+import time
+from typing import List
+
+from benchmarks.common import bootstrap_env, create_schema
+
+
+def seed(engine, page):
+    from app.auth.models import RoleEnum, User
+    from app.orders.models import Order, OrderItem, OrderStatus
+    from app.products.models import Product
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"name": "bench", "email": "bench@gmail.com", "hashed_password": "x", "role": RoleEnum.user}])
+        conn.execute(Product.__table__.insert(), [
+            {"sku": f"B-{i}", "name": f"product {i}", "description": "a reasonably descriptive product blurb " * 3,
+             "price": 10 + i / 7, "stock": i, "category": "bench", "image_url": f"https://img.example.com/{i}.jpg"}
+            for i in range(page)
+        ])
+        conn.execute(Order.__table__.insert(), [
+            {"user_id": 1, "total_amount": 30 + i, "status": OrderStatus.paid} for i in range(page)
+        ])
+        conn.execute(OrderItem.__table__.insert(), [
+            {"order_id": 1 + i // 3, "product_id": 1 + i % page, "quantity": 1 + i % 3, "price_at_purchase": 10 + i % 7}
+            for i in range(page * 3)
+        ])
+
+
+def rate(encode, objects, seconds):
+    """Objects encoded per second, over repeated encodes of the same page."""
+    encode()
+    count, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        encode()
+        count += 1
+    return count * objects / (time.perf_counter() - started)
+
+
+def response_model_encoder(type_, response_class, loop):
+    """What FastAPI does with an endpoint's return value when ``response_model`` is set."""
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    field = create_model_field(name="Response_bench", type_=type_, mode="serialization")
+
+    def encode(content):
+        return response_class(loop.run_until_complete(serialize_response(field=field, response_content=content))).body
+    return encode
+
+
+def run(page, seconds):
+    bootstrap_env()
+    import asyncio
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session, selectinload
+    from app.core.database import engine
+    from app.core.serialization import dump_models, dump_rows
+    from app.orders import models as order_models
+    from app.orders.routes import SUMMARY_COLUMNS
+    from app.orders.schemas import OrderOut, OrderSummary
+    from app.products.cache import PRODUCT_COLUMNS
+    from app.products.models import Product
+    from app.products.schemas import ProductOut
+
+    create_schema(engine)
+    seed(engine, page)
+    with Session(engine) as db:
+        products = db.scalars(select(Product)).all()
+        product_rows = db.execute(select(*PRODUCT_COLUMNS)).all()
+        orders = db.scalars(select(order_models.Order).options(selectinload(order_models.Order.items))).all()
+        order_rows = db.execute(select(*SUMMARY_COLUMNS)).all()
+
+    payloads = [
+        ("products", List[ProductOut], lambda: products, products, product_rows),
+        # the old order history built models itself before returning them
+        ("order summaries", List[OrderSummary], lambda: [OrderSummary.model_validate(o) for o in orders], orders, order_rows),
+        ("orders with items", List[OrderOut], lambda: [OrderOut.model_validate(o) for o in orders], orders, None),
+    ]
+    loop = asyncio.new_event_loop()
+    print(f"{'payload':<20}{'path':<18}{'objects/s':>12}{'speedup':>9}")
+    for name, type_, content, orm, rows in payloads:
+        stdlib = response_model_encoder(type_, JSONResponse, loop)
+        fast = response_model_encoder(type_, ORJSONResponse, loop)
+        paths = [
+            ("response_model", lambda: stdlib(content())),
+            ("+ orjson", lambda: fast(content())),
+            ("TypeAdapter", lambda: dump_models(type_, orm)),
+        ]
+        if rows is not None:
+            paths.append(("trusted rows", lambda: dump_rows(rows)))
+        baseline = None
+        for label, encode in paths:
+            objects_per_second = rate(encode, page, seconds)
+            baseline = baseline or objects_per_second
+            print(f"{name:<20}{label:<18}{objects_per_second:>12.0f}{objects_per_second / baseline:>8.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=100, help="objects per response")
+    parser.add_argument("--seconds", type=float, default=1, help="time spent on each path")
+    args = parser.parse_args()
+    run(args.page, args.seconds)
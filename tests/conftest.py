@@ -0,0 +1,74 @@
+import itertools
+import os
+import tempfile
+
+import pytest
+
+from benchmarks.common import bootstrap_env, create_schema
+
+# a throwaway SQLite database unless TEST_DATABASE_URL points somewhere else
+bootstrap_env(os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='tests-'), 'test.db')}")
+os.environ["LOG_FILE"] = ""
+# no background statements landing inside a query budget
+os.environ["MAINTENANCE_ENABLED"] = "false"
+os.environ["MAIL_POLL_INTERVAL"] = "3600"
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.core.database import engine
+    from app.main import app
+
+    create_schema(engine)
+    with TestClient(app) as client:
+        yield client
+
+
+def sign_up(client, role: str) -> dict:
+    """Headers carrying an access token for a brand new account."""
+    email = f"{role}{next(_emails)}@gmail.com"
+    response = client.post("/auth/signup", json={"name": role.title(), "email": email, "password": "secret1", "role": role})
+    assert response.status_code == 200, response.text
+    response = client.post("/auth/signin", json={"email": email, "password": "secret1"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def admin(client):
+    return sign_up(client, "admin")
+
+
+@pytest.fixture
+def buyer(client):
+    """A user with no cart and no orders yet."""
+    return sign_up(client, "user")
+
+
+@pytest.fixture(scope="session")
+def products(client, admin):
+    ids = []
+    for i in range(5):
+        response = client.post("/admin/products/", headers=admin, json={
+            "name": f"Widget {i}", "description": "a fine widget", "price": 10 + i,
+            "stock": 10000, "category": "tools" if i % 2 else "toys",
+        })
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def fill_cart(client, headers, product_ids):
+    for product_id in product_ids:
+        response = client.post("/cart/", headers=headers, json={"product_id": product_id, "quantity": 1})
+        assert response.status_code == 200, response.text
+
+
+def place_orders(client, headers, product_ids, count: int):
+    for _ in range(count):
+        fill_cart(client, headers, product_ids)
+        response = client.post("/checkout", headers=headers)
+        assert response.status_code == 201, response.text
@@ -0,0 +1,43 @@
+"""Malformed or tampered cursors are a 400, never a failed query."""
+import pytest
+
+from app.core.pagination import encode_cursor
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    encode_cursor({"price": 1}),
+    encode_cursor(["price", 10]),
+    encode_cursor(["price", [1], 1]),
+    encode_cursor(["price", "ten", 1]),
+    encode_cursor(["price", 10, "1"]),
+    encode_cursor(["price", 10, True]),
+])
+def test_listing_rejects_malformed_cursor(client, products, cursor):
+    response = client.get("/products/", params={"sort_by": "price", "after": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_listing_rejects_cursor_of_another_sort(client, products):
+    response = client.get("/products/", params={"sort_by": "price", "after": encode_cursor(["name", "Widget 1", 2])})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor does not match sort_by"
+
+
+def test_listing_follows_its_own_cursor(client, products):
+    first = client.get("/products/", params={"sort_by": "price", "limit": 2})
+    following = client.get("/products/", params={"sort_by": "price", "limit": 2, "after": first.headers["x-next-cursor"]})
+    assert following.status_code == 200
+    assert following.json()[0]["price"] >= first.json()[-1]["price"]
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor([[1], 1]),
+    encode_cursor(["yesterday", 1]),
+    encode_cursor(["2024-01-01T00:00:00", {"id": 1}]),
+])
+def test_order_history_rejects_malformed_cursor(client, buyer, cursor):
+    response = client.get("/orders/", headers=buyer, params={"after": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
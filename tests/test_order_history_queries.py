@@ -0,0 +1,43 @@
+"""Order history costs a fixed number of statements per page, however deep."""
+import pytest
+
+from app.core.profiler import query_budget
+from tests.conftest import place_orders
+
+
+def walk(client, headers, limit: int, include_items: bool):
+    """Every page of the buyer's history with the statements each one took."""
+    pages, after = [], None
+    while True:
+        params = {"limit": limit, "include_items": include_items}
+        if after:
+            params["after"] = after
+        with query_budget(10) as budget:
+            response = client.get("/orders/", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        pages.append((response.json(), budget.count))
+        after = response.headers.get("x-next-cursor")
+        if after is None:
+            return pages
+
+
+@pytest.mark.parametrize("include_items, statements", [(False, 1), (True, 2)])
+def test_statements_per_page(client, buyer, products, include_items, statements):
+    place_orders(client, buyer, products[:3], 5)
+
+    pages = walk(client, buyer, 2, include_items)
+
+    assert [count for _, count in pages] == [statements] * 3
+    orders = [order for page, _ in pages for order in page]
+    assert len({order["id"] for order in orders}) == 5
+    if include_items:
+        assert all(len(order["items"]) == 3 for order in orders)
+
+
+def test_statements_do_not_grow_with_items(client, buyer, products):
+    place_orders(client, buyer, products, 3)
+
+    (page, count), = walk(client, buyer, 10, True)
+
+    assert count == 2
+    assert sum(len(order["items"]) for order in page) == 15
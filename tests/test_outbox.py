@@ -0,0 +1,96 @@
+"""OutboxWorker against a local SMTP stand-in: delivery, refusal with backoff, giving up."""
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.database import engine
+from app.mail.mailer import SMTPMailer
+from app.mail.models import EmailOutbox, OutboxStatus
+from app.mail.outbox import OutboxWorker
+
+
+class Handler:
+    def __init__(self):
+        self.received = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("refused"):
+            return "550 No such mailbox"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+@pytest.fixture
+def worker(client, smtp):
+    with engine.begin() as connection:
+        connection.execute(delete(EmailOutbox))
+    worker = OutboxWorker(SMTPMailer("127.0.0.1", smtp[1], "", "", starttls=False, login=False))
+    yield worker
+    worker.mailer.close()
+
+
+def queue(recipient: str, **values) -> int:
+    with engine.begin() as connection:
+        return connection.execute(EmailOutbox.__table__.insert().values(
+            recipient=recipient, subject="Hello", body="Hi there", next_attempt_at=datetime.utcnow(), **values
+        )).inserted_primary_key[0]
+
+
+def load(message_id: int):
+    with engine.connect() as connection:
+        return connection.execute(select(EmailOutbox).where(EmailOutbox.id == message_id)).one()
+
+
+def test_delivered_message_is_marked_sent(client, smtp, worker):
+    message_id = queue("ok@example.com")
+
+    assert client.portal.call(worker.deliver_batch) == 1
+
+    row = load(message_id)
+    assert (row.status, row.attempts, row.last_error) == (OutboxStatus.sent, 1, None)
+    assert row.sent_at is not None
+    assert smtp[0].received == ["ok@example.com"]
+
+
+def test_refused_recipient_backs_off(client, smtp, worker):
+    message_id = queue("refused@example.com")
+    before = datetime.utcnow()
+
+    assert client.portal.call(worker.deliver_batch) == 1
+
+    row = load(message_id)
+    assert (row.status, row.attempts) == (OutboxStatus.pending, 1)
+    assert "550" in row.last_error
+    assert row.next_attempt_at >= before + timedelta(seconds=settings.mail_retry_base * 0.8)
+    assert client.portal.call(worker.deliver_batch) == 0  # not due again yet
+    assert smtp[0].received == []
+
+
+def test_message_fails_after_max_attempts(client, smtp, worker):
+    message_id = queue("refused@example.com", attempts=settings.mail_max_attempts - 1)
+
+    assert client.portal.call(worker.deliver_batch) == 1
+
+    row = load(message_id)
+    assert (row.status, row.attempts) == (OutboxStatus.failed, settings.mail_max_attempts)
+    assert "550" in row.last_error
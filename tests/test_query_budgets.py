@@ -0,0 +1,48 @@
+"""Statement budgets for the hot endpoints; a new N+1 fails here first."""
+from app.core.profiler import query_budget
+from app.products.cache import listing_cache
+from tests.conftest import fill_cart, place_orders
+
+
+def test_listing(client, products):
+    listing_cache.clear()
+    with query_budget(1):
+        response = client.get("/products/", params={"category": "tools", "sort_by": "price", "limit": 5})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    with query_budget(0):  # served from the listing cache
+        assert client.get("/products/", params={"category": "tools", "sort_by": "price", "limit": 5}).status_code == 200
+
+
+def test_cart_view(client, buyer, products):
+    fill_cart(client, buyer, products)
+    with query_budget(1):
+        response = client.get("/cart/", headers=buyer)
+    assert response.status_code == 200
+    assert response.json()["item_count"] == len(products)
+
+
+def test_checkout(client, buyer, products):
+    fill_cart(client, buyer, products)
+    with query_budget(5):
+        response = client.post("/checkout", headers=buyer)
+    assert response.status_code == 201, response.text
+    assert len(response.json()["items"]) == len(products)
+
+
+def test_checkout_with_idempotency_key(client, buyer, products):
+    fill_cart(client, buyer, products)
+    with query_budget(8):  # checkout plus claiming and storing the key
+        response = client.post("/checkout", headers={**buyer, "Idempotency-Key": "budget-test"})
+    assert response.status_code == 201, response.text
+
+
+def test_order_history(client, buyer, products):
+    place_orders(client, buyer, products, 3)
+    with query_budget(1):
+        assert client.get("/orders/", headers=buyer).status_code == 200
+    with query_budget(2):
+        response = client.get("/orders/", headers=buyer, params={"include_items": True})
+    assert response.status_code == 200
+    assert sum(len(order["items"]) for order in response.json()) == 3 * len(products)
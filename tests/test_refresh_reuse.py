@@ -0,0 +1,17 @@
+"""A replayed refresh token ends every session of its user, whichever worker sees it."""
+
+
+def test_replayed_refresh_token_revokes_sessions(client):
+    email = "refresh-reuse@gmail.com"
+    response = client.post("/auth/signup", json={"name": "Reuse", "email": email, "password": "secret1", "role": "user"})
+    assert response.status_code == 200, response.text
+    first = client.post("/auth/signin", json={"email": email, "password": "secret1"}).json()
+
+    rotated = client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert rotated.status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": first["refresh_token"]}).status_code == 401
+
+    # the replay bumped the token version: the pair issued by the rotation is dead too
+    fresh = rotated.json()
+    assert client.get("/cart/", headers={"Authorization": f"Bearer {fresh['access_token']}"}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": fresh["refresh_token"]}).status_code == 401
@@ -0,0 +1,30 @@
+"""The SQLite search index follows the indexed columns, and only those."""
+import pytest
+from sqlalchemy import text
+
+from app.core.database import engine
+
+
+def search(client, keyword):
+    response = client.get("/products/search", params={"keyword": keyword})
+    assert response.status_code == 200, response.text
+    return [product["name"] for product in response.json()]
+
+
+def test_rename_reindexes(client, admin):
+    created = client.post("/admin/products/", headers=admin, json={
+        "name": "Teapot", "description": "porcelain", "price": 9, "stock": 3, "category": "kitchen",
+    }).json()
+    product = {**created, "name": "Kettle"}
+    del product["id"]
+    assert client.put(f"/admin/products/{created['id']}", headers=admin, json=product).status_code == 200
+
+    assert search(client, "kettle") == ["Kettle"]
+    assert search(client, "teapot") == []
+
+
+@pytest.mark.skipif(engine.dialect.name != "sqlite", reason="PostgreSQL uses a generated column")
+def test_stock_update_does_not_touch_index():
+    with engine.begin() as connection:
+        triggers = connection.scalar(text("SELECT sql FROM sqlite_master WHERE name = 'products_fts_au'"))
+    assert "UPDATE OF name, description, category ON products" in triggers